@@ -16,6 +16,5 @@ for i, line in enumerate(lines):
         if ast:
             node = ast[0]
             print(f"  -> Parsed as: {type(node).__name__}")
-            if hasattr(node, '__dict__'):
-                print(f"  -> Attributes: {node.__dict__}")
+            print(f"  -> Attributes: {node.to_dict()}")
         print()
@@ -5,64 +5,135 @@ Ensures all variable references use the mandatory $ prefix for
 compatibility with transpilation targets and roundtrip fidelity.
 """
 
+import os
 import re
-from typing import Set
+import shutil
+import tempfile
+from functools import lru_cache
+from typing import FrozenSet, Iterable, Iterator
+
+
+# Identifier (including dots for paths), an optional leading $ and an
+# optional trailing '(' marking a function call
+_IDENT_RE = re.compile(r'(\$?)([^\W\d][\w.]*)(\s*\()?')
+
+# Line classifier: state changes (~ expression) or
+# conditionals ((IF: condition), (ELIF: condition))
+_LINE_RE = re.compile(
+    r'^(?P<sc>\s*~\s+)(?P<scexpr>.+)$'
+    r'|^(?P<cd>\s*\((?:IF|ELIF):\s+)(?P<cdexpr>.+)(?P<cdsuf>\).*)$'
+)
+
+
+def _maybe_prefix(match: 're.Match', reserved: FrozenSet[str]) -> str:
+    """Return an identifier match with a $ prefix added where needed."""
+    has_dollar, identifier, call = match.groups()
+    
+    first = identifier[0]
+    if not (first.isalpha() or first == '_'):
+        # Numeric characters like '²' are word characters but can't start
+        # an identifier; keep it and look for identifiers after it
+        rest = match.group(0)[len(has_dollar) + 1:]
+        return has_dollar + first + _normalize_expr(rest, reserved)
+    
+    # Leave existing $ references and function calls untouched
+    if has_dollar or call:
+        return match.group(0)
+    
+    # Check if it's a reserved word (already-lowercase identifiers skip
+    # the .lower() copy)
+    base_identifier = identifier.split('.', 1)[0]
+    if base_identifier in reserved or (
+            not base_identifier.islower() and base_identifier.lower() in reserved):
+        return identifier
+    
+    return '$' + identifier
+
+
+@lru_cache(maxsize=4096)
+def _normalize_expr(expr: str, reserved: FrozenSet[str]) -> str:
+    """Memoized worker for VariableNormalizer.normalize_expression."""
+    return _IDENT_RE.sub(lambda match: _maybe_prefix(match, reserved), expr)
 
 
 class VariableNormalizer:
     """Normalizes FFlow variable references to use mandatory $ prefix."""
     
     # Reserved keywords that should NOT get $ prefix
-    RESERVED = {'true', 'false', 'null', 'random', 'and', 'or', 'not'}
+    RESERVED = frozenset({'true', 'false', 'null', 'random', 'and', 'or', 'not'})
     
     def normalize_expression(self, expr: str) -> str:
         """
         Add $ prefix to variables in expressions that don't have it.
         
+        Results are cached, since scripts repeat the same short expressions
+        (e.g. "turn += 1") many times.
+        
         Args:
             expr: Expression to normalize (e.g., "player.hp += 5")
             
         Returns:
             Normalized expression (e.g., "$player.hp += 5")
         """
-        result = []
-        i = 0
+        reserved = self.RESERVED
+        if not isinstance(reserved, frozenset):
+            reserved = frozenset(reserved)
+        return _normalize_expr(expr, reserved)
+    
+    def normalize_line(self, line: str) -> str:
+        """
+        Normalize variable references in a single FFlow line.
         
-        while i < len(expr):
-            ch = expr[i]
+        Args:
+            line: One line of FFlow content, without its line terminator
             
-            # Check if we're at the start of an identifier
-            if ch.isalpha() or ch == '_':
-                # Look back to see if there's already a $
-                has_dollar = (i > 0 and expr[i-1] == '$')
-                
-                # Collect the full identifier (including dots for paths)
-                j = i
-                while j < len(expr) and (expr[j].isalnum() or expr[j] in '_.'):
-                    j += 1
-                
-                identifier = expr[i:j]
-                
-                # Check if this is a function call (identifier followed by '(')
-                k = j
-                while k < len(expr) and expr[k].isspace():
-                    k += 1
-                is_function = (k < len(expr) and expr[k] == '(')
-                
-                # Check if it's a reserved word
-                base_identifier = identifier.split('.')[0]
-                is_reserved = base_identifier.lower() in self.RESERVED
-                
-                # Add $ prefix if not already there, not a function, and not reserved
-                if not has_dollar and not is_function and not is_reserved:
-                    result.append('$')
-                result.append(identifier)
-                i = j
-            else:
-                result.append(ch)
-                i += 1
+        Returns:
+            Normalized line with $ prefixes added
+        """
+        # Skip frontmatter and empty lines
+        stripped = line.strip()
+        if not stripped or stripped == '===' or stripped.startswith('$'):
+            return line
+        
+        match = _LINE_RE.match(line)
+        
+        # Normalize state changes: ~ expression
+        if match and match.group('sc') is not None:
+            indent = match.group('sc')
+            expr = match.group('scexpr')
+            return indent + self.normalize_expression(expr)
+        
+        # Normalize conditionals: (IF: condition), (ELIF: condition)
+        if match:
+            prefix = match.group('cd')
+            condition = match.group('cdexpr')
+            suffix = match.group('cdsuf')
+            return prefix + self.normalize_expression(condition) + suffix
         
-        return ''.join(result)
+        # Normalize inline text expressions: $variable or ${expression}
+        # This is for text like "Your HP is $player.hp"
+        # Already has $, so skip
+        
+        return line
+    
+    def iter_normalize_lines(self, lines: Iterable[str]) -> Iterator[str]:
+        """
+        Lazily normalize an iterable of FFlow lines (e.g. an open file).
+        
+        A trailing newline on each line is preserved, so the output can be
+        passed straight to ``writelines``.
+        
+        Args:
+            lines: Iterable of lines, with or without trailing newlines
+            
+        Yields:
+            Normalized lines
+        """
+        for line in lines:
+            if line.endswith('\n'):
+                yield self.normalize_line(line[:-1]) + '\n'
+            else:
+                yield self.normalize_line(line)
     
     def normalize_fflow_file(self, content: str) -> str:
         """
@@ -74,57 +145,42 @@ class VariableNormalizer:
         Returns:
             Normalized content with $ prefixes added
         """
-        lines = content.split('\n')
-        normalized_lines = []
-        
-        for line in lines:
-            # Skip frontmatter and empty lines
-            if line.strip() in ['', '==='] or line.startswith('$$') or (line.strip().startswith('$') and ':' in line):
-                normalized_lines.append(line)
-                continue
-            
-            # Normalize state changes: ~ expression
-            if match := re.match(r'^(\s*~\s+)(.+)$', line):
-                indent = match.group(1)
-                expr = match.group(2)
-                normalized_lines.append(indent + self.normalize_expression(expr))
-                continue
-            
-            # Normalize conditionals: (IF: condition), (ELIF: condition)
-            if match := re.match(r'^(\s*\((?:IF|ELIF):\s+)(.+)(\).*)$', line):
-                prefix = match.group(1)
-                condition = match.group(2)
-                suffix = match.group(3)
-                normalized_lines.append(prefix + self.normalize_expression(condition) + suffix)
-                continue
-            
-            # Normalize inline text expressions: $variable or ${expression}
-            # This is for text like "Your HP is $player.hp"
-            # Already has $, so skip
-            
-            normalized_lines.append(line)
-        
-        return '\n'.join(normalized_lines)
+        return '\n'.join(self.iter_normalize_lines(content.split('\n')))
 
 
 def normalize_file(input_path: str, output_path: str = None) -> None:
     """
     Normalize a FFlow file to use mandatory $ prefixes.
     
+    The input is streamed line by line, so the whole file is never held
+    in memory. When overwriting the input, output goes to a temporary file
+    in the same directory which then replaces the original.
+    
     Args:
         input_path: Path to input .fflow file
         output_path: Path to output file (defaults to overwriting input)
     """
     normalizer = VariableNormalizer()
     
-    with open(input_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    normalized = normalizer.normalize_fflow_file(content)
-    
     output_path = output_path or input_path
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(normalized)
+    in_place = os.path.abspath(output_path) == os.path.abspath(input_path)
+    if in_place:
+        fd, write_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(input_path)))
+        os.close(fd)
+    else:
+        write_path = output_path
+    
+    try:
+        with open(input_path, 'r', encoding='utf-8') as infile, \
+                open(write_path, 'w', encoding='utf-8') as outfile:
+            outfile.writelines(normalizer.iter_normalize_lines(infile))
+        if in_place:
+            shutil.copymode(input_path, write_path)
+            os.replace(write_path, output_path)
+    except BaseException:
+        if in_place and os.path.exists(write_path):
+            os.remove(write_path)
+        raise
     
     print(f"Normalized {input_path} -> {output_path}")
 
@@ -1,10 +1,17 @@
 import argparse
 import sys
 import os
-from ..parser.fflow import parse as parse_fflow
+import shutil
+import tempfile
+from dataclasses import fields
+from typing import Callable, Dict, TextIO, Tuple
+from ..parser.fflow import parse as parse_fflow, parse_lines as parse_fflow_lines
 from ..parser.reverse import TweeParser, RenPyParser
 from ..transpiler.formats import TweeTranspiler, RenPyTranspiler, FFlowTranspiler
 
+# Buffer size used when reading input scripts
+READ_BUFFER_SIZE = 65536
+
 def main():
     parser = argparse.ArgumentParser(description="Fountain-Flow Compiler/Transpiler")
     parser.add_argument("input_file", help="Input file path (.fflow, .twee, .rpy)")
@@ -24,18 +31,22 @@ def main():
     ast = None
     input_format = None
     
+    # Input is read as lines so the parser doesn't have to split it again
     if ext == ".fflow":
         input_format = "fflow"
-        with open(input_path, "r", encoding="utf-8") as f:
-            ast = parse_fflow(f.read())
+        with open(input_path, "r", encoding="utf-8", buffering=READ_BUFFER_SIZE) as f:
+            input_lines = f.readlines()
+        ast = parse_fflow_lines(input_lines)
     elif ext in [".twee", ".tw"]:
         input_format = "twee"
-        with open(input_path, "r", encoding="utf-8") as f:
-            ast = TweeParser().parse(f.read())
+        with open(input_path, "r", encoding="utf-8", buffering=READ_BUFFER_SIZE) as f:
+            input_lines = f.readlines()
+        ast = TweeParser().parse_lines(input_lines)
     elif ext == ".rpy":
         input_format = "renpy"
-        with open(input_path, "r", encoding="utf-8") as f:
-            ast = RenPyParser().parse(f.read())
+        with open(input_path, "r", encoding="utf-8", buffering=READ_BUFFER_SIZE) as f:
+            input_lines = f.readlines()
+        ast = RenPyParser().parse_lines(input_lines)
     else:
         print(f"Error: Unknown input format '{ext}'. Supported: .fflow, .twee, .rpy")
         sys.exit(1)
@@ -62,8 +73,13 @@ def main():
         transpiler = RenPyTranspiler()
     elif target_format == "fflow":
         transpiler = FFlowTranspiler()
-        
-    output_text = transpiler.transpile(ast)
+    
+    # Only applicable if we have a reverse parser/transpiler combo
+    can_verify = False
+    
+    if (input_format == "fflow" and target_format == "twee") or \
+       (input_format == "twee" and target_format == "fflow"):
+        can_verify = True
     
     # 4. Output
     if args.out:
@@ -76,8 +92,12 @@ def main():
         out_ext = ext_map.get(target_format, ".txt")
         out_path = os.path.join("output", f"{filename}{out_ext}")
 
-    with open(out_path, "w", encoding="utf-8") as f:
-        f.write(output_text)
+    if can_verify:
+        # Verification re-parses the output, so keep it as one string
+        output_text = transpiler.transpile(ast)
+        _write_output(out_path, lambda f: f.write(output_text))
+    else:
+        _write_output(out_path, lambda f: transpiler.transpile_to(ast, f))
     print(f"Written to {out_path}")
     
     # 5. Verification
@@ -86,88 +106,142 @@ def main():
     # Source -> Target -> Roundtrip -> Roundtrip AST
     # Compare Source AST vs Roundtrip AST
     
-    # Only applicable if we have a reverse parser/transpiler combo
-    can_verify = False
-    
-    if (input_format == "fflow" and target_format == "twee") or \
-       (input_format == "twee" and target_format == "fflow"):
-        can_verify = True
-         
     if can_verify:
         print("Verifying fidelity...")
         try:
             roundtrip_ast = []
+            # Set when the roundtrip text reproduces the input, ignoring
+            # trailing whitespace; it then parses to the source AST, so the
+            # final parse is skipped
+            verbatim = False
             
             # Full Roundtrip Check
             if input_format == "fflow" and target_format == "twee":
                 # 1. We have Source AST (ast) and Output Twee (output_text)
                 # 2. Parse Twee -> Intermediate AST
                 twee_ast = TweeParser().parse(output_text)
-                # 3. Transpile Intermediate AST -> Roundtrip FFlow
+                # 3. Transpile Intermediate AST -> Roundtrip FFlow lines
                 fflow_transpiler = FFlowTranspiler()
-                roundtrip_fflow = fflow_transpiler.transpile(twee_ast)
-                # 4. Parse Roundtrip FFlow -> Final AST
-                roundtrip_ast = parse_fflow(roundtrip_fflow)
+                roundtrip_lines = list(fflow_transpiler.transpile_lines(twee_ast))
+                # 4. Parse Roundtrip FFlow -> Final AST, straight from the
+                # lines without an intermediate text buffer
+                verbatim = _is_verbatim_roundtrip(input_lines, roundtrip_lines)
+                if not verbatim:
+                    roundtrip_ast = parse_fflow_lines(roundtrip_lines)
                 
             elif input_format == "twee" and target_format == "fflow":
                 # 1. We have Source AST (ast) and Output FFlow (output_text)
                 # 2. Parse FFlow -> Intermediate AST
                 intermediate_ast = parse_fflow(output_text)
-                # 3. Transpile Intermediate AST -> Roundtrip Twee
+                # 3. Transpile Intermediate AST -> Roundtrip Twee lines
                 twee_transpiler = TweeTranspiler()
-                roundtrip_twee = twee_transpiler.transpile(intermediate_ast)
+                roundtrip_lines = list(twee_transpiler.transpile_lines(intermediate_ast))
                 # 4. Parse Roundtrip Twee -> Final AST
-                roundtrip_ast = TweeParser().parse(roundtrip_twee)
+                verbatim = _is_verbatim_roundtrip(input_lines, roundtrip_lines)
+                if not verbatim:
+                    roundtrip_ast = TweeParser().parse_lines(roundtrip_lines)
                 
             else:
                  # Fallback
                  print(f"Warning: Full roundtrip verification not implemented for {input_format} -> {target_format}")
                  roundtrip_ast = []
 
-            # Compare Source AST vs Roundtrip AST
-            errors = compare_asts(ast, roundtrip_ast)
-            
-            if not errors:
-                print("Fidelity Check: PASSED")
+            if verbatim:
+                print("Fidelity Check: PASSED (identical modulo trailing whitespace)")
             else:
-                print(f"Fidelity Check: FAILED with {len(errors)} errors.")
-                with open("fidelity_error.log", "w", encoding="utf-8") as log:
-                    log.write(f"Roundtrip fidelity check failed for {input_path} -> {target_format} -> {input_format}\n")
-                    log.write("\n".join(errors))
-                print("See fidelity_error.log for details.")
+                # Compare Source AST vs Roundtrip AST
+                errors = compare_asts(ast, roundtrip_ast)
+                
+                if not errors:
+                    print("Fidelity Check: PASSED")
+                else:
+                    print(f"Fidelity Check: FAILED with {len(errors)} errors.")
+                    with open("fidelity_error.log", "w", encoding="utf-8") as log:
+                        log.write(f"Roundtrip fidelity check failed for {input_path} -> {target_format} -> {input_format}\n")
+                        log.write("\n".join(errors))
+                    print("See fidelity_error.log for details.")
                 
         except Exception as e:
             print(f"Verification crashed: {e}")
             import traceback
             traceback.print_exc()
 
+def _write_output(out_path: str, write: Callable[[TextIO], object]) -> None:
+    """
+    Write an output file through a temporary file in the same directory.
+    
+    The target is only replaced once ``write`` has finished, so a transpile
+    that fails part-way never leaves a truncated (or empty) output file.
+    """
+    fd, write_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(out_path)))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            write(f)
+        if os.path.exists(out_path):
+            shutil.copymode(out_path, write_path)
+        else:
+            # mkstemp creates the file as 0600; use the usual umask-based mode
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(write_path, 0o666 & ~umask)
+        os.replace(write_path, out_path)
+    except BaseException:
+        if os.path.exists(write_path):
+            os.remove(write_path)
+        raise
+
+def _canonical_lines(lines) -> list[str]:
+    """Lines without terminators, trailing blank lines or trailing whitespace."""
+    canonical = [line.rstrip("\n") for line in lines]
+    while canonical and not canonical[-1].strip():
+        canonical.pop()
+    if canonical:
+        canonical[-1] = canonical[-1].rstrip()
+    return canonical
+
+def _is_verbatim_roundtrip(input_lines, roundtrip_lines) -> bool:
+    """Check whether a roundtrip reproduced the input text, ignoring trailing whitespace."""
+    return _canonical_lines(input_lines) == _canonical_lines(roundtrip_lines)
+
+# Per-class field names compared during verification (depth is ignored)
+_FIELD_NAMES: Dict[type, Tuple[str, ...]] = {}
+
+def _field_names(cls) -> Tuple[str, ...]:
+    names = _FIELD_NAMES.get(cls)
+    if names is None:
+        names = _FIELD_NAMES[cls] = tuple(f.name for f in fields(cls) if f.name != "depth")
+    return names
+
+def _node_key(node) -> tuple:
+    """Canonical comparison key for a node: stripped field strings, minus depth."""
+    return tuple(str(getattr(node, k)).strip() for k in _field_names(type(node)))
+
 def compare_asts(ast1, ast2) -> list[str]:
+    # Fast path: build one key per node up front; equal ASTs need no diff
+    keys1 = [(type(n), _node_key(n)) for n in ast1]
+    keys2 = [(type(n), _node_key(n)) for n in ast2]
+    if keys1 == keys2:
+        return []
+    
     errors = []
     if len(ast1) != len(ast2):
         errors.append(f"Node count mismatch: Original {len(ast1)} vs Roundtrip {len(ast2)}")
-        min_len = min(len(ast1), len(ast2))
-    else:
-        min_len = len(ast1)
         
-    for i in range(min_len):
+    for i, (key1, key2) in enumerate(zip(keys1, keys2)):
+        if key1 == key2:
+            continue
+        
         n1 = ast1[i]
         n2 = ast2[i]
         
         if type(n1) != type(n2):
             errors.append(f"Node {i} type mismatch: {type(n1).__name__} vs {type(n2).__name__}")
             continue
-            
-        d1 = n1.__dict__
-        d2 = n2.__dict__
         
-        for k, v in d1.items():
-            if k == "depth": continue 
-            
-            if k not in d2:
-                errors.append(f"Node {i} ({type(n1).__name__}) missing field {k} in roundtrip.")
-                continue
-            
-            val2 = d2[k]
+        # Both nodes share a type, so they share the same fields
+        for k in _field_names(type(n1)):
+            v = getattr(n1, k)
+            val2 = getattr(n2, k)
             
             v_str = str(v).strip()
             val2_str = str(val2).strip()
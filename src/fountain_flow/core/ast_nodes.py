@@ -1,39 +1,46 @@
-from dataclasses import dataclass, field
-from typing import List, Optional, Union, Dict, Any
+from dataclasses import dataclass, field, fields
+from typing import List, Optional, Union, Dict, Any, Tuple
 
-@dataclass
+# Field names per node class, filled on first use by ScriptNode.to_dict
+_FIELD_NAMES: Dict[type, Tuple[str, ...]] = {}
+
+@dataclass(slots=True)
 class ScriptNode:
     """Base class for all AST nodes."""
     def to_dict(self) -> Dict[str, Any]:
-        return {k: v for k, v in self.__dict__.items() if v is not None}
+        cls = type(self)
+        names = _FIELD_NAMES.get(cls)
+        if names is None:
+            names = _FIELD_NAMES[cls] = tuple(f.name for f in fields(cls))
+        return {k: v for k in names if (v := getattr(self, k)) is not None}
 
-@dataclass
+@dataclass(slots=True)
 class FrontmatterNode(ScriptNode):
     """Represents the initial configuration block."""
     variables: Dict[str, Any] = field(default_factory=dict)
     depth: int = 0
 
-@dataclass
+@dataclass(slots=True)
 class SceneHeadingNode(ScriptNode):
     """Standard Fountain Scene Heading (INT./EXT.)."""
     scene_id: str  # Auto-generated or explicit
     text: str
     depth: int = 0
 
-@dataclass
+@dataclass(slots=True)
 class SectionHeadingNode(ScriptNode):
     """Section Heading used as anchor (# SCENE_NAME)."""
     text: str
     anchor: str
     depth: int = 0
 
-@dataclass
+@dataclass(slots=True)
 class ActionNode(ScriptNode):
     """Descriptive text."""
     text: str
     depth: int = 0
 
-@dataclass
+@dataclass(slots=True)
 class DialogueNode(ScriptNode):
     """Character name and dialogue."""
     character: str
@@ -41,20 +48,20 @@ class DialogueNode(ScriptNode):
     parenthetical: Optional[str] = None
     depth: int = 0
 
-@dataclass
+@dataclass(slots=True)
 class AssetNode(ScriptNode):
     """Asset injection (! TYPE: id)."""
     asset_type: str
     data: str
     depth: int = 0
 
-@dataclass
+@dataclass(slots=True)
 class StateChangeNode(ScriptNode):
     """Variable mutation (~ VAR = VAL)."""
     expression: str
     depth: int = 0
 
-@dataclass
+@dataclass(slots=True)
 class LogicNode(ScriptNode):
     """Logic block wrapper (IF/ELSE/END)."""
     start_condition: Optional[str] = None  # content of (IF: ...)
@@ -63,13 +70,13 @@ class LogicNode(ScriptNode):
     is_end: bool = False
     depth: int = 0
 
-@dataclass
+@dataclass(slots=True)
 class DecisionNode(ScriptNode):
     """Decision prompt (? Prompt)."""
     text: str
     depth: int = 0
 
-@dataclass
+@dataclass(slots=True)
 class ChoiceNode(ScriptNode):
     """Interactive choice (+ [Label] Text -> #TARGET)."""
     label: str
@@ -78,7 +85,7 @@ class ChoiceNode(ScriptNode):
     conditions: List[str] = field(default_factory=list) # For (IF:...) inside choices
     depth: int = 0
 
-@dataclass
+@dataclass(slots=True)
 class JumpNode(ScriptNode):
     """Direct jump (-> #TARGET)."""
     target: str
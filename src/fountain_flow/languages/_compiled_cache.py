@@ -0,0 +1,17 @@
+"""
+Shared cache of compiled regexes for language definitions.
+
+Languages often define patterns with identical regex source. Compiling
+through this cache gives every such pattern the same re.Pattern object
+instead of one copy per language.
+"""
+
+from functools import lru_cache
+from typing import Pattern
+import re
+
+
+@lru_cache(maxsize=None)
+def compile_pattern(regex: str, flags: int = 0) -> Pattern:
+    """Compile a regex, reusing the result for identical source and flags."""
+    return re.compile(regex, flags)
@@ -8,28 +8,72 @@ transformation logic, allowing the core parser and transpiler to be language-agn
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Dict, List, Pattern, Callable, Type, Any, Optional
+from typing import Dict, List, Pattern, Callable, Tuple, Type, Any, Optional
 import re
 import sys
 from ..core.ast_nodes import ScriptNode
+from ._compiled_cache import compile_pattern
 
 
-@dataclass
+@dataclass(slots=True)
 class PatternDef:
-    """Definition of a syntax pattern for a language element."""
+    """
+    Definition of a syntax pattern for a language element.
+    
+    Patterns are matched against lines that have already been stripped by
+    the parser, so they don't need a leading ``^\\s*``.
+    
+    Regexes use Unicode matching, since groups capture names the user wrote
+    (labels, variables, asset types). Set ascii=True to compile with
+    re.ASCII instead; only do that for patterns whose groups never capture
+    user text.
+    
+    A standalone PatternDef compiles its regex lazily on the first call to
+    match(). Patterns owned by a LanguageDefinition are compiled up front,
+    once per language class, so matching never pays the compile check.
+    """
     name: str
     regex: str
     compiled: Optional[Pattern] = field(default=None, init=False)
     node_type: Optional[Type[ScriptNode]] = None
     priority: int = 0  # Higher priority patterns are checked first
+    # Characters a (left-stripped) line must start with for this pattern to
+    # match; None means the pattern can match lines starting with anything
+    prefix_chars: Optional[str] = None
+    ascii: bool = False
     
-    def __post_init__(self):
-        """Compile the regex pattern after initialization."""
-        self.compiled = re.compile(self.regex)
+    def compile(self) -> Pattern:
+        """Compile the regex if needed and return the compiled pattern."""
+        if self.compiled is None:
+            self.compiled = compile_pattern(self.regex, re.ASCII if self.ascii else 0)
+        return self.compiled
     
     def match(self, line: str):
-        """Match the pattern against a line of text."""
-        return self.compiled.match(line)
+        """Match the pattern against a line of text, compiling on first use."""
+        compiled = self.compiled
+        if compiled is None:
+            compiled = self.compile()
+        return compiled.match(line)
+
+
+def fuse_patterns(patterns: List[PatternDef]) -> Optional[Pattern]:
+    """
+    Compile patterns into a single alternation regex.
+    
+    Each pattern becomes a named group ``p<index>`` so ``match.lastgroup``
+    identifies which one matched. Patterns with ascii=True keep their flag
+    through a scoped inline ``(?a:...)`` group.
+    
+    Returns:
+        The compiled alternation, or None for an empty pattern list
+    """
+    if not patterns:
+        return None
+    alternatives = [
+        f"(?P<p{i}>(?a:{p.regex}))" if p.ascii else f"(?P<p{i}>{p.regex})"
+        for i, p in enumerate(patterns)
+    ]
+    return re.compile("|".join(alternatives))
 
 
 class LanguageDefinition(ABC):
@@ -41,15 +85,131 @@ class LanguageDefinition(ABC):
     2. Node type mappings (which AST node to create)
     3. Expression transformers (how to convert expressions between formats)
     4. Formatting rules (how to generate output text)
+    
+    Patterns are built, sorted and compiled once per class and shared by
+    all of its instances as a tuple in priority order, so matching never
+    sorts and the order can't be changed through an instance.
+    
+    A pattern's index in ``patterns`` is its integer ID. The matcher looks
+    up compiled regexes in a parallel per-ID tuple instead of going through
+    each PatternDef's attributes.
     """
     
     def __init__(self):
-        self.patterns: List[PatternDef] = []
-        self._pattern_map: Dict[str, PatternDef] = {}
-        self._initialize_patterns()
-        # Sort patterns by priority (higher first)
-        self.patterns.sort(key=lambda p: p.priority, reverse=True)
-        self._pattern_map = {p.name: p for p in self.patterns}
+        self.patterns: Tuple[PatternDef, ...] = self._compiled_patterns()
+        self._pattern_map: Dict[str, PatternDef] = {p.name: p for p in self.patterns}
+        self._pat_compiled = tuple(p.compiled for p in self.patterns)
+        self._build_fused_patterns()
+    
+    @classmethod
+    def _compiled_patterns(cls) -> Tuple[PatternDef, ...]:
+        """Get this class's patterns in priority order, building them on first use."""
+        # Look in the class's own namespace so a subclass never reuses the
+        # patterns of the language it extends
+        patterns = cls.__dict__.get('_pattern_cache')
+        if patterns is None:
+            patterns = cls._initialize_patterns()
+            # Sort patterns by priority (higher first)
+            patterns.sort(key=lambda p: p.priority, reverse=True)
+            for pattern in patterns:
+                # Interned names let callers compare them by identity
+                pattern.name = sys.intern(pattern.name)
+                pattern.compile()
+            patterns = cls._pattern_cache = tuple(patterns)
+        return patterns
+    
+    def _build_fused_patterns(self):
+        """
+        Bucket patterns by the first character of the lines they can match,
+        and fuse each bucket into one alternation regex.
+        
+        Each bucket also holds the patterns without a declared prefix, so
+        every bucket is a complete candidate list in priority order.
+        Alternatives keep that order, so the regex engine picks the same
+        pattern a one-by-one scan would, in a single call. Each fused regex
+        is stored with the IDs of its patterns and, per alternative, the
+        slice of the fused match's groups() holding that pattern's groups.
+        """
+        ids = {id(p): i for i, p in enumerate(self.patterns)}
+        
+        def fuse(patterns):
+            spans = []
+            offset = 0
+            for p in patterns:
+                # Skip the alternative's own p<index> wrapper group
+                offset += 1
+                spans.append((offset, offset + p.compiled.groups))
+                offset += p.compiled.groups
+            return fuse_patterns(patterns), tuple(ids[id(p)] for p in patterns), tuple(spans)
+        
+        self._fused_fallback = fuse([p for p in self.patterns if not p.prefix_chars])
+        chars = {c for p in self.patterns if p.prefix_chars for c in p.prefix_chars}
+        self._fused_by_prefix: Dict[str, tuple] = {
+            c: fuse([p for p in self.patterns if not p.prefix_chars or c in p.prefix_chars])
+            for c in chars
+        }
+    
+    def match_line(self, line: str):
+        """
+        Find the highest-priority pattern matching a line.
+        
+        Returns:
+            A (PatternDef, match) tuple, or None if no pattern matches
+        """
+        return next(self.iter_matches(line), None)
+    
+    def _scan(self, line: str):
+        """
+        Yield (pattern ID, match, span) for every pattern matching a line,
+        in priority order.
+        
+        The fused regex jumps straight to the first match; later patterns
+        are only tried if the caller asks for more (e.g. when the first
+        match produces no node). For that first pattern, match is the fused
+        match and span the slice of its groups() holding the pattern's own
+        groups; for the rest, match is the pattern's match and span is None.
+        """
+        fused, pat_ids, spans = self._fused_by_prefix.get(line.lstrip()[:1], self._fused_fallback)
+        if fused is None:
+            return
+        first = fused.match(line)
+        if first is None:
+            return
+        start = int(first.lastgroup[1:])
+        yield pat_ids[start], first, spans[start]
+        compiled = self._pat_compiled
+        for i in pat_ids[start + 1:]:
+            match = compiled[i].match(line)
+            if match:
+                yield i, match, None
+    
+    def iter_matches(self, line: str):
+        """
+        Yield (PatternDef, match) for every pattern matching a line, in
+        priority order.
+        """
+        patterns = self.patterns
+        compiled = self._pat_compiled
+        for i, match, span in self._scan(line):
+            if span is not None:
+                # Callers expect the pattern's own group numbering
+                match = compiled[i].match(line)
+            yield patterns[i], match
+    
+    def iter_match_groups(self, line: str):
+        """
+        Yield (PatternDef, groups) for every pattern matching a line, in
+        priority order, where groups is the pattern's match.groups().
+        
+        Unlike iter_matches, the first pattern isn't matched a second time:
+        its groups are sliced out of the fused match.
+        """
+        patterns = self.patterns
+        for i, match, span in self._scan(line):
+            if span is None:
+                yield patterns[i], match.groups()
+            else:
+                yield patterns[i], match.groups()[span[0]:span[1]]
     
     @property
     @abstractmethod
@@ -63,9 +223,10 @@ class LanguageDefinition(ABC):
         """File extensions for this language (e.g., ['.fflow'])."""
         pass
     
+    @classmethod
     @abstractmethod
-    def _initialize_patterns(self):
-        """Initialize the syntax patterns for this language."""
+    def _initialize_patterns(cls) -> List[PatternDef]:
+        """Build the syntax patterns for this language."""
         pass
     
     def get_pattern(self, name: str) -> Optional[PatternDef]:
@@ -96,6 +257,11 @@ class LanguageDefinition(ABC):
         return cond
     
     # Output formatting methods (for transpilers)
+    #
+    # Each format_* method returns the text for a single node, without a
+    # trailing newline. GenericTranspiler collects these fragments in a list
+    # and joins them once, so implementations should never accumulate
+    # output across calls.
     
     def format_frontmatter(self, variables: Dict[str, Any]) -> str:
         """Format frontmatter/initialization block."""
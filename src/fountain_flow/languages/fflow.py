@@ -6,7 +6,10 @@ which is the base format for fountain-flow. It extends standard Fountain screenp
 format with interactive narrative elements.
 """
 
-from typing import Dict, Any
+import io
+import re
+import string
+from typing import Dict, Any, List
 from .base import LanguageDefinition, PatternDef
 from ..core.ast_nodes import (
     FrontmatterNode, SceneHeadingNode, SectionHeadingNode,
@@ -15,6 +18,11 @@ from ..core.ast_nodes import (
 )
 
 
+# $-prefixed variable reference: $varname, $object.property, $_localvar.
+# Public so parsers that strip FFlow variable sigils share one grammar.
+VAR_REF_RE = re.compile(r'\$([a-zA-Z_][\w.]*)')
+
+
 class FFlowLanguage(LanguageDefinition):
     """FFlow language definition."""
     
@@ -26,156 +34,181 @@ class FFlowLanguage(LanguageDefinition):
     def file_extensions(self) -> list:
         return [".fflow"]
     
-    def _initialize_patterns(self):
+    @classmethod
+    def _initialize_patterns(cls) -> List[PatternDef]:
         """Initialize FFlow syntax patterns based on the specification."""
+        patterns = []
         
         # Frontmatter patterns (highest priority)
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="frontmatter_end",
             regex=r'^===\s*$',
-            priority=100
+            priority=100,
+            prefix_chars="=",
+            ascii=True
         ))
         
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="frontmatter_parent",
             regex=r'^\$\$\s*(\w+)',
-            priority=95
+            priority=95,
+            prefix_chars="$"
         ))
         
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="frontmatter_var",
             regex=r'^\$\s*(.+)',
-            priority=90
+            priority=90,
+            prefix_chars="$"
         ))
         
         # Flow control patterns
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="asset",
-            regex=r'^\s*!\s*(\w+):\s*(.+)',
+            regex=r'^!\s*(\w+):\s*(.+)',
             node_type=AssetNode,
-            priority=80
+            priority=80,
+            prefix_chars="!"
         ))
         
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="state_change",
-            regex=r'^\s*~\s*(.+)',
+            regex=r'^~\s*(.+)',
             node_type=StateChangeNode,
-            priority=75
+            priority=75,
+            prefix_chars="~"
         ))
         
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="decision",
-            regex=r'^\s*\?\s*(.+)',
+            regex=r'^\?\s*(.+)',
             node_type=DecisionNode,
-            priority=70
+            priority=70,
+            prefix_chars="?"
         ))
         
         # Choice with brackets: + [Label] Description -> #Target
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="choice_bracket",
-            regex=r'^\s*\+\s*\[(.+?)\]\s*(.*?)\s*->\s*#(.+)$',
+            regex=r'^\+\s*\[(.+?)\]\s*(.*?)\s*->\s*#(.+)$',
             node_type=ChoiceNode,
-            priority=66
+            priority=66,
+            prefix_chars="+"
         ))
         
         # Choice without brackets: + ->Label->#Target (simplified)
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="choice",
-            regex=r'^\s*\+\s*->(.+?)->\s*#(.+)$',
+            regex=r'^\+\s*->(.+?)->\s*#(.+)$',
             node_type=ChoiceNode,
-            priority=65
+            priority=65,
+            prefix_chars="+"
         ))
         
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="jump",
-            regex=r'^\s*->\s*#(.+)',
+            regex=r'^->\s*#(.+)',
             node_type=JumpNode,
-            priority=60
+            priority=60,
+            prefix_chars="-"
         ))
         
         # Inline choice with bracket syntax: [Label|#Target]
         # Must have # in target part
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="inline_choice",
-            regex=r'^\s*\[(.*?)\|#(.+?)\]\s*$',
+            regex=r'^\[(.*?)\|#(.+?)\]\s*$',
             node_type=ChoiceNode,
-            priority=58
+            priority=58,
+            prefix_chars="["
         ))
         
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="implicit_choice",
-            regex=r'^\s*->\s*(?!#)(.+?)->\s*#(.+)$',
+            regex=r'^->\s*(?!#)(.+?)->\s*#(.+)$',
             node_type=ChoiceNode,
-            priority=55
+            priority=55,
+            prefix_chars="-"
         ))
         
         # Conditional patterns
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="conditional_if",
-            regex=r'^\s*\(IF:\s*(.+)\)',
+            regex=r'^\(IF:\s*(.+)\)',
             node_type=LogicNode,
-            priority=50
+            priority=50,
+            prefix_chars="("
         ))
         
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="conditional_elif",
-            regex=r'^\s*\(ELIF:\s*(.+)\)',
+            regex=r'^\(ELIF:\s*(.+)\)',
             node_type=LogicNode,
-            priority=50
+            priority=50,
+            prefix_chars="("
         ))
         
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="conditional_else",
-            regex=r'^\s*\(ELSE\)',
+            regex=r'^\(ELSE\)',
             node_type=LogicNode,
-            priority=50
+            priority=50,
+            prefix_chars="("
         ))
         
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="conditional_end",
-            regex=r'^\s*\(END\)',
+            regex=r'^\(END\)',
             node_type=LogicNode,
-            priority=50
+            priority=50,
+            prefix_chars="("
         ))
         
         # Structural patterns
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="section_heading",
-            regex=r'^\s*#\s*(.+)',
+            regex=r'^#\s*(.+)',
             node_type=SectionHeadingNode,
-            priority=45
+            priority=45,
+            prefix_chars="#"
         ))
         
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="scene_heading",
             regex=r'^(INT\.|EXT\.|EST\.|INT\./EXT\.|I/E)\s*(.+)',
             node_type=SceneHeadingNode,
-            priority=40
+            priority=40,
+            prefix_chars="IE"
         ))
         
         # Character name (for dialogue detection)
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="character",
             regex=r'^([A-Z0-9 ]*[A-Z0-9]+)(\s*\(.*\))?$',
             node_type=DialogueNode,
-            priority=30
+            priority=30,
+            prefix_chars=string.ascii_uppercase + string.digits
         ))
         
         # Parenthetical
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="parenthetical",
-            regex=r'^\s*(\(.*\))\s*$',
-            priority=35
+            regex=r'^(\(.*\))\s*$',
+            priority=35,
+            prefix_chars="("
         ))
+        
+        return patterns
     
     # FFlow uses identity transformations (no prefix changes)
     
     def normalize_expression(self, expr: str) -> str:
         """Strip $ prefixes from expressions for consistent FFlow syntax."""
-        import re
+        # Most FFlow expressions carry no $ at all; skip the regex for them
+        if '$' not in expr:
+            return expr
         # Remove $ prefix from all variable references
-        # Matches $varname, $object.property, $_localvar
-        return re.sub(r'\$([a-zA-Z_][\w.]*)', r'\1', expr)
+        return VAR_REF_RE.sub(r'\1', expr)
     
     def transform_variable_reference(self, var_name: str) -> str:
         """FFlow variables don't have prefixes."""
@@ -193,18 +226,19 @@ class FFlowLanguage(LanguageDefinition):
     
     def format_frontmatter(self, variables: Dict[str, Any]) -> str:
         """Format frontmatter in FFlow syntax."""
-        lines = []
+        buf = io.StringIO()
+        w = buf.write
         for key, value in variables.items():
             if isinstance(value, dict):
                 # Parent object
-                lines.append(f"$$ {key}")
+                w(f"$$ {key}\n")
                 for child_key, child_val in value.items():
-                    lines.append(f"    $ {child_key}: {child_val}")
+                    w(f"    $ {child_key}: {child_val}\n")
             else:
                 # Simple variable
-                lines.append(f"$ {key}: {value}")
-        lines.append("===")
-        return "\n".join(lines)
+                w(f"$ {key}: {value}\n")
+        w("===")
+        return buf.getvalue()
     
     def format_scene_heading(self, scene_id: str, text: str) -> str:
         """Format a scene heading."""
@@ -6,12 +6,85 @@ Languages are auto-discovered from the languages/ directory and can be retrieved
 or file extension.
 """
 
-from typing import Dict, List, Optional, Type
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Type
 import importlib
-import inspect
+import os
 from .base import LanguageDefinition
 
 
+# Modules in the languages/ directory that never define a language
+_NON_LANGUAGE_MODULES = frozenset({'base', 'registry'})
+
+
+@lru_cache(maxsize=None)
+def _discover_language_classes() -> Tuple[Type[LanguageDefinition], ...]:
+    """
+    Find the LanguageDefinition subclasses in the languages/ directory.
+    
+    The directory is scanned and its modules imported once; every registry
+    reuses the result instead of rescanning.
+    """
+    languages_dir = os.path.dirname(__file__)
+    
+    for filename in sorted(os.listdir(languages_dir)):
+        if not filename.endswith('.py') or filename.startswith('_'):
+            continue
+        module_name = filename[:-3]  # Remove .py extension
+        if module_name in _NON_LANGUAGE_MODULES:
+            continue
+        
+        try:
+            importlib.import_module(f'.{module_name}', package=__package__)
+        except Exception as e:
+            print(f"Warning: Failed to load language module {module_name}: {e}")
+    
+    # Walk the LanguageDefinition subclass tree (in definition order),
+    # skipping abstract intermediate classes
+    classes = []
+    pending = list(LanguageDefinition.__subclasses__())
+    while pending:
+        cls = pending.pop(0)
+        if cls in classes:
+            continue
+        if not cls.__abstractmethods__:
+            classes.append(cls)
+        pending.extend(cls.__subclasses__())
+    return tuple(classes)
+
+
+# Transform methods that are replaced with _identity when a language
+# returns its input unchanged
+_TRANSFORM_METHODS = (
+    'transform_variable_reference',
+    'transform_expression',
+    'transform_condition',
+)
+
+
+def _identity(value):
+    """Return value unchanged."""
+    return value
+
+
+def _specialize_identity_transforms(language: LanguageDefinition):
+    """
+    Replace no-op transform methods on a language instance with _identity.
+    
+    Each method is probed with a sentinel object; only a method that hands
+    the very same object back is replaced, so callers skip the method
+    binding on every call without any change in results.
+    """
+    sentinel = object()
+    for method_name in _TRANSFORM_METHODS:
+        try:
+            is_identity = getattr(language, method_name)(sentinel) is sentinel
+        except Exception:
+            is_identity = False
+        if is_identity:
+            setattr(language, method_name, _identity)
+
+
 class LanguageRegistry:
     """
     Central registry for language definitions.
@@ -23,42 +96,17 @@ class LanguageRegistry:
     def __init__(self):
         self._languages: Dict[str, LanguageDefinition] = {}
         self._extension_map: Dict[str, LanguageDefinition] = {}
+        # Lookup keys for each extension, both with and without the dot
+        self._extension_lookup: Dict[str, LanguageDefinition] = {}
         self._discover_languages()
     
     def _discover_languages(self):
-        """Auto-discover language definitions from the languages/ directory."""
-        # Get the directory containing this file
-        languages_dir = os.path.dirname(__file__)
-        
-        # Find all Python files in the languages directory
-        for filename in os.listdir(languages_dir):
-            if not filename.endswith('.py'):
-                continue
-            if filename.startswith('_'):
-                continue
-            if filename == 'base.py':
-                continue
-            if filename == 'registry.py':
-                continue
-            
-            module_name = filename[:-3]  # Remove .py extension
-            
+        """Instantiate and register the language definitions in the languages/ directory."""
+        for cls in _discover_language_classes():
             try:
-                # Import the module
-                module = importlib.import_module(f'.{module_name}', package=__package__)
-                
-                # Find all LanguageDefinition subclasses in the module
-                for name, obj in inspect.getmembers(module, inspect.isclass):
-                    if issubclass(obj, LanguageDefinition) and obj != LanguageDefinition:
-                        # Instantiate the language definition
-                        try:
-                            lang_def = obj()
-                            self.register(lang_def)
-                        except Exception as e:
-                            print(f"Warning: Failed to instantiate {name}: {e}")
-            
+                self.register(cls())
             except Exception as e:
-                print(f"Warning: Failed to load language module {module_name}: {e}")
+                print(f"Warning: Failed to instantiate {cls.__name__}: {e}")
     
     def register(self, language: LanguageDefinition):
         """
@@ -67,11 +115,15 @@ class LanguageRegistry:
         Args:
             language: The language definition to register
         """
+        _specialize_identity_transforms(language)
         self._languages[language.name] = language
         
         # Register all file extensions
         for ext in language.file_extensions:
-            self._extension_map[ext.lower()] = language
+            ext = ext.lower()
+            self._extension_map[ext] = language
+            self._extension_lookup[ext] = language
+            self._extension_lookup[ext.lstrip('.')] = language
     
     def get_language(self, name: str) -> Optional[LanguageDefinition]:
         """
@@ -95,9 +147,8 @@ class LanguageRegistry:
         Returns:
             The language definition, or None if not found
         """
-        if not extension.startswith('.'):
-            extension = '.' + extension
-        return self._extension_map.get(extension.lower())
+        lookup = self._extension_lookup
+        return lookup.get(extension) or lookup.get(extension.lower())
     
     def list_languages(self) -> List[str]:
         """
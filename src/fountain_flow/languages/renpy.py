@@ -5,7 +5,9 @@ This module defines the syntax rules and transformation logic for Ren'Py script
 commonly used for visual novels.
 """
 
-from typing import Dict, Any
+import io
+from functools import lru_cache
+from typing import Dict, Any, List
 from .base import LanguageDefinition, PatternDef
 from ..core.ast_nodes import (
     FrontmatterNode, SceneHeadingNode, SectionHeadingNode,
@@ -14,6 +16,36 @@ from ..core.ast_nodes import (
 )
 
 
+# Scene labels map spaces, dots and dashes to underscores
+_RENPY_SLUG_TABLE = str.maketrans({' ': '_', '.': '_', '-': '_'})
+# Section labels and jump targets only map spaces
+_RENPY_LABEL_TABLE = str.maketrans({' ': '_'})
+
+
+# Asset types played as music
+_RPY_MUSIC_SFX = frozenset({"MUSIC", "SFX"})
+
+
+# Scripts reuse a small set of names many times, so cache the conversions
+
+@lru_cache(maxsize=512)
+def _renpy_slug(text: str) -> str:
+    """Convert a scene heading to a RenPy label name."""
+    return text.translate(_RENPY_SLUG_TABLE).lower()
+
+
+@lru_cache(maxsize=512)
+def _renpy_label(name: str) -> str:
+    """Convert a section anchor or jump target to a RenPy label name."""
+    return name.translate(_RENPY_LABEL_TABLE).lower()
+
+
+@lru_cache(maxsize=512)
+def _renpy_char(name: str) -> str:
+    """Convert a character name to a RenPy character identifier."""
+    return name.lower()
+
+
 class RenPyLanguage(LanguageDefinition):
     """Ren'Py language definition."""
     
@@ -25,74 +57,84 @@ class RenPyLanguage(LanguageDefinition):
     def file_extensions(self) -> list:
         return [".rpy"]
     
-    def _initialize_patterns(self):
+    @classmethod
+    def _initialize_patterns(cls) -> List[PatternDef]:
         """Initialize Ren'Py syntax patterns."""
+        patterns = []
         
         # Label (section/scene markers)
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="label",
             regex=r'^label\s+(\w+):',
             node_type=SectionHeadingNode,
-            priority=90
+            priority=90,
+            prefix_chars="l"
         ))
         
         # Variable assignment
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="var_assign",
             regex=r'^\$\s*(\w+)\s*=\s*(.+)',
             node_type=StateChangeNode,
-            priority=85
+            priority=85,
+            prefix_chars="$"
         ))
         
         # Scene command (background)
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="scene",
             regex=r'^scene\s+(.+)',
             node_type=AssetNode,
-            priority=80
+            priority=80,
+            prefix_chars="s"
         ))
         
         # Show command (character sprite)
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="show",
             regex=r'^show\s+(.+)',
             node_type=AssetNode,
-            priority=80
+            priority=80,
+            prefix_chars="s"
         ))
         
         # Menu (decision point)
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="menu",
             regex=r'^menu:',
             node_type=DecisionNode,
-            priority=75
+            priority=75,
+            prefix_chars="m"
         ))
         
         # Jump command
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="jump",
             regex=r'^jump\s+(\w+)',
             node_type=JumpNode,
-            priority=70
+            priority=70,
+            prefix_chars="j"
         ))
         
         # Conditionals
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="if",
             regex=r'^if\s+(.+):',
             node_type=LogicNode,
-            priority=65
+            priority=65,
+            prefix_chars="i"
         ))
         
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="else",
             regex=r'^else:',
             node_type=LogicNode,
-            priority=65
+            priority=65,
+            prefix_chars="e"
         ))
         
         # Dialogue with character
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="dialogue",
             regex=r'^(\w+)\s+"(.+)"',
             node_type=DialogueNode,
@@ -100,12 +142,15 @@ class RenPyLanguage(LanguageDefinition):
         ))
         
         # Action (quoted text)
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="action",
             regex=r'^"(.+)"',
             node_type=ActionNode,
-            priority=55
+            priority=55,
+            prefix_chars='"'
         ))
+        
+        return patterns
     
     # Expression transformations (RenPy uses Python syntax)
     
@@ -125,25 +170,25 @@ class RenPyLanguage(LanguageDefinition):
     
     def format_frontmatter(self, variables: Dict[str, Any]) -> str:
         """Format frontmatter as variable definitions."""
-        lines = []
+        buf = io.StringIO()
+        w = buf.write
         for key, value in variables.items():
             if isinstance(value, dict):
                 # Python dict literal
                 dict_str = ", ".join([f'"{k}": {v}' for k, v in value.items()])
-                lines.append(f"$ {key} = {{ {dict_str} }}")
+                w(f"$ {key} = {{ {dict_str} }}\n")
             else:
-                lines.append(f"$ {key} = {value}")
-        return "\n".join(lines)
+                w(f"$ {key} = {value}\n")
+        # Drop the newline after the last definition
+        return buf.getvalue()[:-1]
     
     def format_scene_heading(self, scene_id: str, text: str) -> str:
         """Format as label."""
-        safe_id = text.replace(" ", "_").replace(".", "_").replace("-", "_").lower()
-        return f"label {safe_id}:"
+        return f"label {_renpy_slug(text)}:"
     
     def format_section_heading(self, anchor: str, text: str) -> str:
         """Format as label."""
-        safe_id = anchor.replace(" ", "_").lower()
-        return f"label {safe_id}:"
+        return f"label {_renpy_label(anchor)}:"
     
     def format_action(self, text: str) -> str:
         """Format action as quoted text."""
@@ -154,16 +199,17 @@ class RenPyLanguage(LanguageDefinition):
         # RenPy format: char "text"
         if parenthetical:
             # Could include parenthetical in text or ignore
-            return f'{character.lower()} "{text}"'
-        return f'{character.lower()} "{text}"'
+            return f'{_renpy_char(character)} "{text}"'
+        return f'{_renpy_char(character)} "{text}"'
     
     def format_asset(self, asset_type: str, data: str) -> str:
         """Format asset directive."""
-        if asset_type.upper() == "BG":
+        kind = asset_type.upper()
+        if kind == "BG":
             return f"scene {data}"
-        elif asset_type.upper() == "SHOW":
+        elif kind == "SHOW":
             return f"show {data}"
-        elif asset_type.upper() in ["MUSIC", "SFX"]:
+        elif kind in _RPY_MUSIC_SFX:
             return f'play music "{data}"'
         else:
             return f"# Asset: {asset_type}: {data}"
@@ -198,5 +244,4 @@ class RenPyLanguage(LanguageDefinition):
     
     def format_jump(self, target: str) -> str:
         """Format jump."""
-        safe_target = target.replace(" ", "_").lower()
-        return f"jump {safe_target}"
+        return f"jump {_renpy_label(target)}"
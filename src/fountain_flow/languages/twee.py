@@ -6,7 +6,7 @@ with SugarCube macros, commonly used in Twine interactive fiction.
 """
 
 import re
-from typing import Dict, Any
+from typing import Dict, Any, List
 from .base import LanguageDefinition, PatternDef
 from ..core.ast_nodes import (
     FrontmatterNode, SceneHeadingNode, SectionHeadingNode,
@@ -15,6 +15,55 @@ from ..core.ast_nodes import (
 )
 
 
+# Inline jump in action text: "text -> #target"
+_INLINE_JUMP_RE = re.compile(r'^(.+?)\s*->\s*#(.+)$')
+# $-prefixed variable reference
+_DOLLAR_VAR_RE = re.compile(r'\$([a-zA-Z_])')
+# Variable references shown in passage text: _word or known_object.property
+_DISPLAY_VAR_RE = re.compile(r'(?<![$\w])(_\w+|\b(?:player|goblin)\.\w+)')
+# Passage-safe names: scene headings drop dots, other names map them to
+# underscores, and choice targets also drop the # anchor marker
+_SCENE_SAFE_TABLE = str.maketrans({'.': None, ' ': '_', '-': '_'})
+_NAME_SAFE_TABLE = str.maketrans({' ': '_', '.': '_'})
+_CHOICE_SAFE_TABLE = str.maketrans({'#': None, ' ': '_', '.': '_'})
+# A character float() never accepts: anything but whitespace, digits,
+# signs, '.', '_', exponents and the letters of "inf"/"infinity"/"nan"
+_NON_NUMERIC_RE = re.compile(r'[^\s\d+\-._eEinftyaINFTYA]')
+
+# Identifier (including dotted paths like player.hp) with the $ that may
+# precede it and the "(" that follows it in a function call
+_EXPR_IDENT_RE = re.compile(r'(\$?)([^\W\d][\w.]*)(\s*\()?')
+
+
+def _prefix_identifier(match) -> str:
+    """Add a $ prefix to an identifier unless it already has one or is called."""
+    dollar, identifier, call = match.groups()
+    first = identifier[0]
+    if not (first.isalpha() or first == '_'):
+        # Numeric characters like '²' are word characters but can't start
+        # an identifier; keep it and look for identifiers after it
+        rest = match.group(0)[len(dollar) + 1:]
+        return dollar + first + _EXPR_IDENT_RE.sub(_prefix_identifier, rest)
+    if dollar or call:
+        return match.group(0)
+    return '$' + identifier
+
+
+def _prefix_state_identifier(match) -> str:
+    """
+    Like _prefix_identifier, but also turn a ' to ' operator into ' = '.
+    
+    A bare 'to' would get a $ prefix, so ' to ' can only survive prefixing
+    when 'to' looks like a call (e.g. 'x to (y + 1)'); rewrite exactly those.
+    """
+    dollar, identifier, call = match.groups()
+    start = match.start()
+    if (identifier == 'to' and not dollar and call and call[0] == ' '
+            and start and match.string[start - 1] == ' '):
+        return '=' + call
+    return _prefix_identifier(match)
+
+
 class TweeLanguage(LanguageDefinition):
     """Twee/SugarCube language definition."""
     
@@ -26,113 +75,131 @@ class TweeLanguage(LanguageDefinition):
     def file_extensions(self) -> list:
         return [".twee", ".tw"]
     
-    def _initialize_patterns(self):
+    @classmethod
+    def _initialize_patterns(cls) -> List[PatternDef]:
         """Initialize Twee/SugarCube syntax patterns."""
+        patterns = []
         
         # Passage structure
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="passage",
             regex=r'^::\s*(.+)',
             node_type=SectionHeadingNode,
-            priority=100
+            priority=100,
+            prefix_chars=":"
         ))
         
         # Macros - State changes
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="macro_set",
             regex=r'<<set\s+\$([\w.]+)\s*(to|=|\+=|-=|\*=|/=)\s*(.+)>>',
             node_type=StateChangeNode,
-            priority=90
+            priority=90,
+            prefix_chars="<"
         ))
         
         # Macro patterns
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="macro_if",
-            regex=r'^\s*<<if\s+(.+?)>>\s*$',
+            regex=r'^<<if\s+(.+?)>>\s*$',
             node_type=LogicNode,
-            priority=80
+            priority=80,
+            prefix_chars="<"
         ))
         
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="macro_elseif",
-            regex=r'^\s*<<elseif\s+(.+?)>>\s*$',
+            regex=r'^<<elseif\s+(.+?)>>\s*$',
             node_type=LogicNode,
-            priority=80
+            priority=80,
+            prefix_chars="<"
         ))
         
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="macro_else",
             regex=r'<<else>>',
             node_type=LogicNode,
-            priority=80
+            priority=80,
+            prefix_chars="<"
         ))
         
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="macro_endif",
             regex=r'<<(?:endif|/if)>>',
             node_type=LogicNode,
-            priority=80
+            priority=80,
+            prefix_chars="<"
         ))
         
         # Macros - Navigation
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="macro_goto",
             regex=r'<<goto\s+"(.+)">>',
             node_type=JumpNode,
-            priority=80
+            priority=80,
+            prefix_chars="<"
         ))
         
         # Macros - Assets
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="macro_bg",
             regex=r'<<bg\s+"(.+)">>',
             node_type=AssetNode,
-            priority=75
+            priority=75,
+            prefix_chars="<"
         ))
         
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="macro_show",
             regex=r'<<show\s+"(.+)">>',
             node_type=AssetNode,
-            priority=75
+            priority=75,
+            prefix_chars="<"
         ))
         
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="macro_audio",
             regex=r'<<audio\s+"(.+)"\s+play>>',
             node_type=AssetNode,
-            priority=75
+            priority=75,
+            prefix_chars="<"
         ))
         
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="macro_run",
             regex=r'<<run\s+(.+)>>',
-            priority=70
+            priority=70,
+            prefix_chars="<"
         ))
         
         # Links (choices)
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="link",
             regex=r'\[\[(.*?)(?:\|(.*?))?\]\]',
             node_type=ChoiceNode,
-            priority=65
+            priority=65,
+            prefix_chars="["
         ))
         
         # HTML image tags
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="img_tag",
             regex=r'<img src="(.+)">',
             node_type=AssetNode,
-            priority=60
+            priority=60,
+            prefix_chars="<"
         ))
         
         # Dialogue (bold text with colon)
-        self.patterns.append(PatternDef(
+        patterns.append(PatternDef(
             name="dialogue",
             regex=r'\*\*(.+?)\*\*:(.+)',
             node_type=DialogueNode,
-            priority=50
+            priority=50,
+            prefix_chars="*"
         ))
+        
+        return patterns
     
     # Expression transformation methods
     
@@ -150,42 +217,7 @@ class TweeLanguage(LanguageDefinition):
         # "player.hp > 5" -> "$player.hp > 5"
         # "$player.hp = $player.maxHP" -> "$player.hp = $player.maxHP" (no change)
         # "random(3, player.maxHP)" -> "random(3, $player.maxHP)" (don't prefix function names)
-        
-        # Use a simple state machine approach
-        result = []
-        i = 0
-        while i < len(expr):
-            ch = expr[i]
-            
-            # Check if we're at the start of an identifier
-            if ch.isalpha() or ch == '_':
-                # Look back to see if there's already a $
-                has_dollar = (i > 0 and expr[i-1] == '$')
-                
-                # Collect the full identifier (including dots for paths like player.hp)
-                j = i
-                while j < len(expr) and (expr[j].isalnum() or expr[j] in '_.'):
-                    j += 1
-                
-                identifier = expr[i:j]
-                
-                # Check if this is a function call (identifier followed by '(')
-                # Skip whitespace after identifier to check
-                k = j
-                while k < len(expr) and expr[k].isspace():
-                    k += 1
-                is_function = (k < len(expr) and expr[k] == '(')
-                
-                # Add $ prefix if not already there and not a function call
-                if not has_dollar and not is_function:
-                    result.append('$')
-                result.append(identifier)
-                i = j
-            else:
-                result.append(ch)
-                i += 1
-        
-        return ''.join(result)
+        return _EXPR_IDENT_RE.sub(_prefix_identifier, expr)
     
     def transform_condition(self, cond: str) -> str:
         """Transform condition to add $ prefixes."""
@@ -193,7 +225,7 @@ class TweeLanguage(LanguageDefinition):
     
     def strip_variable_prefix(self, expr: str) -> str:
         """Remove $ prefix from variables (for parsing Twee -> FFlow)."""
-        return re.sub(r'\$([a-zA-Z_])', r'\1', expr)
+        return _DOLLAR_VAR_RE.sub(r'\1', expr)
     
     # Output formatting methods
     
@@ -211,16 +243,21 @@ class TweeLanguage(LanguageDefinition):
                     else:
                         # String value - check if it's a numeric string
                         v_str = str(v)
-                        # Try to detect if it's a number
-                        try:
-                            # Try parsing as int or float
-                            num_val = float(v_str)
-                            # Use int representation if it's a whole number
-                            if num_val == int(num_val):
-                                obj_parts.append(f"{k}: {int(num_val)}")
-                            else:
-                                obj_parts.append(f"{k}: {num_val}")
-                        except ValueError:
+                        # Try to detect if it's a number; strings with a
+                        # character float() never accepts skip the attempt
+                        num_val = None
+                        if not _NON_NUMERIC_RE.search(v_str):
+                            try:
+                                # Try parsing as int or float
+                                num_val = float(v_str)
+                                # Use int representation if it's a whole number
+                                if num_val == int(num_val):
+                                    num_val = int(num_val)
+                            except ValueError:
+                                num_val = None
+                        if num_val is not None:
+                            obj_parts.append(f"{k}: {num_val}")
+                        else:
                             # Not a number - quote it
                             if not (v_str.startswith('"') or v_str.startswith("'")):
                                 v_str = f'"{v_str}"'
@@ -236,24 +273,22 @@ class TweeLanguage(LanguageDefinition):
         """Format as a passage."""
         # Convert scene heading to safe passage name
         # Strip periods first, then replace spaces with underscores
-        safe_id = text.replace(".", "").replace(" ", "_").replace("-", "_")
+        safe_id = text.translate(_SCENE_SAFE_TABLE)
         return f":: {safe_id}"
     
     def format_section_heading(self, anchor: str, text: str) -> str:
         """Format as a passage."""
-        safe_id = anchor.replace(" ", "_").replace(".", "_")
+        safe_id = anchor.translate(_NAME_SAFE_TABLE)
         return f":: {safe_id}"
     
     def format_action(self, text: str) -> str:
         """Format action text, handling inline jumps and variable interpolation."""
-        import re
-        
         # Check for inline jump pattern: "text -> #target"
-        match = re.match(r'^(.+?)\s*->\s*#(.+)$', text)
+        match = _INLINE_JUMP_RE.match(text)
         if match:
             action_text = match.group(1).strip()
             target = match.group(2).strip()
-            safe_target = target.replace(" ", "_").replace(".", "_")
+            safe_target = target.translate(_NAME_SAFE_TABLE)
             # Apply variable interpolation to action text for Twee display
             action_text = self._add_variable_prefixes(action_text)
             return f"{action_text}\n<<goto \"{safe_target}\">>"
@@ -263,18 +298,9 @@ class TweeLanguage(LanguageDefinition):
     
     def _add_variable_prefixes(self, text: str) -> str:
         """Add $ prefix to variable references in text for SugarCube display."""
-        import re
         # Match variable patterns: _varname or object.property
-        # Don't modify if already has $
-        def replace_var(match):
-            var_ref = match.group(0)
-            if var_ref.startswith('$'):
-                return var_ref
-            return f'${var_ref}'
-        
-        # Match: _word or known_object.property
-        pattern = r'(?<![$\w])(_\w+|\b(?:player|goblin)\.\w+)'
-        return re.sub(pattern, replace_var, text)
+        # The pattern never matches right after a $, so every match gets one
+        return _DISPLAY_VAR_RE.sub(r'$\1', text)
     
     def format_dialogue(self, character: str, text: str, parenthetical: str = None) -> str:
         """Format dialogue in bold Markdown."""
@@ -297,12 +323,8 @@ class TweeLanguage(LanguageDefinition):
     
     def format_state_change(self, expression: str) -> str:
         """Format state change as <<set>> macro."""
-        # Transform expression to add $ prefixes
-        transformed = self.transform_expression(expression)
-        
-        # Normalize operators
-        transformed = transformed.replace(' to ', ' = ')
-        
+        # Add $ prefixes and normalize the ' to ' operator in one pass
+        transformed = _EXPR_IDENT_RE.sub(_prefix_state_identifier, expression)
         return f"<<set {transformed}>>"
     
     def format_logic_start(self, condition: str) -> str:
@@ -332,7 +354,7 @@ class TweeLanguage(LanguageDefinition):
         # Twee format: [[Label|Target]]
         # We strip the # prefix from target if present for Twee compatibility
         if target:
-            safe_target = target.replace("#", "").replace(" ", "_").replace(".", "_")
+            safe_target = target.translate(_CHOICE_SAFE_TABLE)
             if text and text != label:
                 return f"[[{text}|{safe_target}]]"
             else:
@@ -342,6 +364,6 @@ class TweeLanguage(LanguageDefinition):
     
     def format_jump(self, target: str) -> str:
         """Format jump as a clickable link instead of auto-goto to allow text to display."""
-        safe_target = target.replace(" ", "_").replace(".", "_")
+        safe_target = target.translate(_NAME_SAFE_TABLE)
         # Use a clickable link so text displays before transition
         return f"[[Continue|{safe_target}]]"
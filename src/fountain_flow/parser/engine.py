@@ -6,13 +6,18 @@ It uses the patterns and transformations defined in language modules to parse te
 """
 
 import re
-from typing import List, Optional, Dict, Any
+import sys
+from typing import Callable, Iterable, List, Optional, Dict, Any, Tuple
 from ..core.ast_nodes import (
     ScriptNode, ScriptAST, FrontmatterNode, SceneHeadingNode, SectionHeadingNode,
     ActionNode, DialogueNode, AssetNode, StateChangeNode, LogicNode,
     DecisionNode, ChoiceNode, JumpNode
 )
-from ..languages.base import LanguageDefinition
+from ..languages.base import LanguageDefinition, fuse_patterns
+
+
+# Name of a frontmatter parent object, following the leading "$$"
+_FM_PARENT_NAME_RE = re.compile(r'\s*(\w+)')
 
 
 class GenericParser:
@@ -35,6 +40,14 @@ class GenericParser:
         self.in_frontmatter = False
         self.current_frontmatter: Dict[str, Any] = {}
         self.current_frontmatter_parent: Optional[str] = None
+        # FFlow has a $-line frontmatter block handled before pattern matching
+        self._is_fflow = language.name == "fflow"
+        self._handlers = self._build_handlers()
+        # Patterns that end a dialogue block, fused into one regex (None if
+        # the language has none of them)
+        self._dialogue_break_re = fuse_patterns([
+            p for p in language.patterns if p.name in self._DIALOGUE_BREAK_NAMES
+        ])
     
     def parse(self, script_text: str) -> ScriptAST:
         """
@@ -43,6 +56,22 @@ class GenericParser:
         Args:
             script_text: The script text to parse
             
+        Returns:
+            Abstract Syntax Tree as a list of ScriptNode objects
+        """
+        return self.parse_lines(script_text.split('\n'))
+    
+    def parse_lines(self, lines: Iterable[str]) -> ScriptAST:
+        """
+        Parse pre-split script lines into an AST.
+        
+        Lines may keep their trailing newline (e.g. from ``readlines()``).
+        Any iterable is accepted, such as a transpiler's ``transpile_lines``
+        output; it is materialized once because dialogue parsing looks ahead.
+        
+        Args:
+            lines: The script lines to parse
+            
         Returns:
             Abstract Syntax Tree as a list of ScriptNode objects
         """
@@ -50,19 +79,23 @@ class GenericParser:
         self.in_frontmatter = False
         self.current_frontmatter = {}
         self.current_frontmatter_parent = None
+        # Bound once; the frontmatter handler appends to the same list
+        append = self.nodes.append
         
-        lines = script_text.split('\n')
+        if not isinstance(lines, list):
+            lines = list(lines)
+        n = len(lines)
+        is_fflow = self._is_fflow
         idx = 0
         
-        while idx < len(lines):
+        while idx < n:
             raw_line = lines[idx]
             
             # Calculate indentation
-            match_indent = re.match(r'^(\s*)', raw_line)
-            indent_chars = len(match_indent.group(1)) if match_indent else 0
-            indent_level = indent_chars // 4
+            stripped = raw_line.lstrip()
+            indent_level = (len(raw_line) - len(stripped)) // 4
             
-            line = raw_line.strip()
+            line = stripped.rstrip()
             
             # Skip empty lines
             if not line:
@@ -73,39 +106,35 @@ class GenericParser:
             matched = False
             
             # Special handling for frontmatter (FFlow specific)
-            if self.language.name == "fflow":
+            if is_fflow:
                 matched, new_idx = self._handle_fflow_frontmatter(line, idx, indent_level)
                 if matched:
                     idx = new_idx + 1  # Increment idx to move to next line
                     continue
             
-            # Try all patterns in priority order
-            for pattern in self.language.patterns:
-                match = pattern.match(line)
-                if not match:
-                    continue
-                
+            # Try matching patterns in priority order
+            for pattern, groups in self.language.iter_match_groups(line):
                 # Handle the match based on pattern name and node type
-                node = self._create_node_from_pattern(pattern, match, line, lines, idx, indent_level)
+                node = self._create_node_from_pattern(pattern, groups, line, lines, idx, indent_level)
                 
                 if node is not None:
                     # Check if this is a character line (potential dialogue)
                     if isinstance(node, DialogueNode) and pattern.name == "character":
                         # Look ahead for dialogue text
-                        dialogue_node, new_idx = self._parse_dialogue(lines, idx, line, indent_level)
+                        dialogue_node, new_idx = self._parse_dialogue(lines, idx, line, indent_level, n)
                         if dialogue_node:
-                            self.nodes.append(dialogue_node)
+                            append(dialogue_node)
                             idx = new_idx
                             matched = True
                             break
                     else:
-                        self.nodes.append(node)
+                        append(node)
                         matched = True
                         break
             
             if not matched:
                 # Fallback: treat as action
-                self.nodes.append(ActionNode(text=line, depth=indent_level))
+                append(ActionNode(text=line, depth=indent_level))
             
             idx += 1
         
@@ -129,7 +158,8 @@ class GenericParser:
             if self.in_frontmatter:
                 # Parent object: $$ name
                 if line.startswith('$$'):
-                    parent_match = re.match(r'^\$\$\s*(\w+)', line)
+                    # The $$ is already checked, so match the name after it
+                    parent_match = _FM_PARENT_NAME_RE.match(line, 2)
                     if parent_match:
                         self.current_frontmatter_parent = parent_match.group(1)
                         self.current_frontmatter[self.current_frontmatter_parent] = {}
@@ -137,10 +167,10 @@ class GenericParser:
                 
                 # Variable: $ key: value
                 if line.startswith('$'):
-                    parts = line.lstrip('$').split(':', 1)
-                    if len(parts) == 2:
-                        key = parts[0].strip()
-                        val = parts[1].strip()
+                    key, sep, val = line.lstrip('$').partition(':')
+                    if sep:
+                        key = key.strip()
+                        val = val.strip()
                         
                         # Strip quotes from string values for normalization
                         # Both "value" and 'value' should become value
@@ -157,14 +187,14 @@ class GenericParser:
         
         return False, idx
     
-    def _create_node_from_pattern(self, pattern, match, line: str, lines: List[str], 
+    def _create_node_from_pattern(self, pattern, groups, line: str, lines: List[str], 
                                    idx: int, indent_level: int) -> Optional[ScriptNode]:
         """
         Create an AST node from a pattern match.
         
         Args:
             pattern: The PatternDef that matched
-            match: The regex match object
+            groups: The pattern's match groups (match.groups())
             line: The current line
             lines: All lines being parsed
             idx: Current line index
@@ -173,151 +203,201 @@ class GenericParser:
         Returns:
             A ScriptNode or None
         """
-        node_type = pattern.node_type
-        
-        if node_type is None:
+        handler = self._handlers.get(pattern.name)
+        if handler is None:
             return None
+        return handler(groups, line, indent_level)
+    
+    def _build_handlers(self) -> Dict[str, Callable]:
+        """
+        Map each of the language's pattern names to its node handler.
         
-        # Create node based on type
-        if node_type == AssetNode:
-            if pattern.name == "asset":
-                return AssetNode(asset_type=match.group(1), data=match.group(2), depth=indent_level)
-            elif pattern.name == "macro_bg":
-                return AssetNode(asset_type="BG", data=match.group(1), depth=indent_level)
-            elif pattern.name == "macro_show":
-                return AssetNode(asset_type="SHOW", data=match.group(1), depth=indent_level)
-            elif pattern.name == "macro_audio":
-                return AssetNode(asset_type="MUSIC", data=match.group(1), depth=indent_level)
-            elif pattern.name == "scene":
-                return AssetNode(asset_type="BG", data=match.group(1), depth=indent_level)
-            elif pattern.name == "show":
-                return AssetNode(asset_type="SHOW", data=match.group(1), depth=indent_level)
-        
-        elif node_type == StateChangeNode:
-            if pattern.name == "state_change":
-                expr = match.group(1)
-                # Normalize FFlow expressions to remove $ prefixes
-                if hasattr(self.language, 'normalize_expression'):
-                    expr = self.language.normalize_expression(expr)
-                return StateChangeNode(expression=expr, depth=indent_level)
-            elif pattern.name == "macro_set":
-                # Twee format: <<set $var = val>>
-                # Keep $ prefixes as-is since FFlow supports both formats
-                var = match.group(1)  # Already stripped by pattern
-                op = match.group(2)
-                val = match.group(3)
-                if op == 'to':
-                    op = '='
-                # Preserve $ prefixes in value expressions for FFlow
-                expr = f"${var} {op} {val}"
-                return StateChangeNode(expression=expr, depth=indent_level)
-            elif pattern.name == "var_assign":
-                # RenPy format: $ var = val
-                var = match.group(1)
-                val = match.group(2)
-                expr = f"{var} = {val}"
-                return StateChangeNode(expression=expr, depth=indent_level)
-        
-        elif node_type == DecisionNode:
-            if pattern.name == "decision":
-                return DecisionNode(text=match.group(1), depth=indent_level)
-            elif pattern.name == "menu":
-                return DecisionNode(text="Choice", depth=indent_level)
-        
-        elif node_type == ChoiceNode:
-            if pattern.name == "choice_bracket":
-                # Matches: + [Label] Description -> #Target
-                label = match.group(1).strip()
-                text = match.group(2).strip()
-                target = match.group(3).strip()
-                return ChoiceNode(label=label, text=text, target=target, depth=indent_level)
-            elif pattern.name == "choice":
-                # Matches: + ->Label->#Target (simplified)
-                label = match.group(1).strip()
-                target = match.group(2).strip()
-                return ChoiceNode(label=label, text="", target=target, depth=indent_level)
-            elif pattern.name == "implicit_choice":
-                # Matches: ->Label->#Target
-                text = match.group(1)
-                target = match.group(2)
-                # Set text="" to match Twee behavior and consistency with other choices
-                return ChoiceNode(label=text, text="", target=target, depth=indent_level)
-            elif pattern.name == "inline_choice":
-                # Matches: [Label|#Target]
-                # Target group captures name AFTER #
-                label = match.group(1)
-                target = match.group(2)
-                return ChoiceNode(label=label, text="", target=target, depth=indent_level)
-            elif pattern.name == "link":
-                # Twee [[Label|Target]] link
-                label = match.group(1)
-                target = match.group(2) if match.lastindex >= 2 else label
-                # Check if this is a "Continue" link (jump) vs a choice
-                if label.strip().lower() == "continue":
-                    # This is a jump converted to a link - convert back to JumpNode
-                    return JumpNode(target=target, depth=indent_level)
-                else:
-                    # Regular choice link
-                    return ChoiceNode(label=label, text="", target=target, depth=indent_level)
-        
-        elif node_type == JumpNode:
-            if pattern.name == "jump":
-                return JumpNode(target=match.group(1), depth=indent_level)
-            elif pattern.name == "macro_goto":
-                return JumpNode(target=match.group(1), depth=indent_level)
-        
-        elif node_type == LogicNode:
-            if pattern.name in ["conditional_if", "macro_if", "if"]:
-                cond = match.group(1) if match.lastindex >= 1 else None
-                # Normalize FFlow conditions to remove $ prefixes
-                if cond and hasattr(self.language, 'normalize_expression'):
-                    cond = self.language.normalize_expression(cond)
-                return LogicNode(start_condition=cond, depth=indent_level)
-            elif pattern.name in ["conditional_elif", "macro_elseif"]:
-                cond = match.group(1)
-                # Normalize FFlow conditions to remove $ prefixes
-                if hasattr(self.language, 'normalize_expression'):
-                    cond = self.language.normalize_expression(cond)
-                return LogicNode(start_condition=cond, is_elif=True, depth=indent_level)
-            elif pattern.name in ["conditional_else", "macro_else", "else"]:
-                return LogicNode(is_else=True, depth=indent_level)
-            elif pattern.name in ["conditional_end", "macro_endif"]:
-                return LogicNode(is_end=True, depth=indent_level)
-        
-        elif node_type == SceneHeadingNode:
-            if pattern.name == "scene_heading":
-                return SceneHeadingNode(scene_id="SCENE", text=line, depth=indent_level)
-        
-        elif node_type == SectionHeadingNode:
-            if pattern.name == "section_heading":
-                return SectionHeadingNode(text=line, anchor=match.group(1), depth=indent_level)
-            elif pattern.name == "label":
-                label = match.group(1)
-                return SectionHeadingNode(text=label, anchor=label, depth=indent_level)
-            elif pattern.name == "passage":
-                # Twee passage: :: PassageName
-                passage_name = match.group(1)
-                return SectionHeadingNode(text=passage_name, anchor=passage_name, depth=indent_level)
-        
-        elif node_type == DialogueNode:
-            if pattern.name == "dialogue":
-                # Could be Twee format: **Character**: Text
-                # or RenPy format: character "text"
-                if self.language.name == "twee":
-                    char = match.group(1)
-                    text = match.group(2)
-                    return DialogueNode(character=char, text=text, depth=indent_level)
-                elif self.language.name == "renpy":
-                    char = match.group(1)
-                    text = match.group(2)
-                    return DialogueNode(character=char, text=text, depth=indent_level)
-            # For FFlow character pattern, return a marker (will be handled separately)
-            return DialogueNode(character="", text="", depth=indent_level)
-        
-        return None
+        A handler is only used when the pattern's node type is the one it
+        builds. Any other DialogueNode pattern (e.g. the FFlow character cue)
+        gets the dialogue marker handler.
+        """
+        handlers = {}
+        for pattern in self.language.patterns:
+            entry = self._PATTERN_HANDLERS.get(pattern.name)
+            if entry is not None and entry[0] is pattern.node_type:
+                handlers[pattern.name] = getattr(self, entry[1])
+            elif pattern.node_type is DialogueNode:
+                handlers[pattern.name] = self._h_dialogue_marker
+        return handlers
+    
+    # Node handlers: each takes (groups, line, indent_level) and returns a node.
+    # Jump/choice targets and asset types repeat throughout a script, so they
+    # are interned to share one string object per distinct value.
+    
+    def _h_asset(self, groups, line: str, indent_level: int) -> AssetNode:
+        return AssetNode(asset_type=sys.intern(groups[0]), data=groups[1], depth=indent_level)
+    
+    def _h_bg(self, groups, line: str, indent_level: int) -> AssetNode:
+        return AssetNode(asset_type="BG", data=groups[0], depth=indent_level)
+    
+    def _h_show(self, groups, line: str, indent_level: int) -> AssetNode:
+        return AssetNode(asset_type="SHOW", data=groups[0], depth=indent_level)
+    
+    def _h_music(self, groups, line: str, indent_level: int) -> AssetNode:
+        return AssetNode(asset_type="MUSIC", data=groups[0], depth=indent_level)
+    
+    def _h_state_change(self, groups, line: str, indent_level: int) -> StateChangeNode:
+        expr = groups[0]
+        # Normalize FFlow expressions to remove $ prefixes
+        if hasattr(self.language, 'normalize_expression'):
+            expr = self.language.normalize_expression(expr)
+        return StateChangeNode(expression=expr, depth=indent_level)
+    
+    def _h_macro_set(self, groups, line: str, indent_level: int) -> StateChangeNode:
+        # Twee format: <<set $var = val>>
+        # Keep $ prefixes as-is since FFlow supports both formats
+        var = groups[0]  # Already stripped by pattern
+        op = groups[1]
+        val = groups[2]
+        if op == 'to':
+            op = '='
+        # Preserve $ prefixes in value expressions for FFlow
+        expr = f"${var} {op} {val}"
+        return StateChangeNode(expression=expr, depth=indent_level)
+    
+    def _h_var_assign(self, groups, line: str, indent_level: int) -> StateChangeNode:
+        # RenPy format: $ var = val
+        var = groups[0]
+        val = groups[1]
+        expr = f"{var} = {val}"
+        return StateChangeNode(expression=expr, depth=indent_level)
+    
+    def _h_decision(self, groups, line: str, indent_level: int) -> DecisionNode:
+        return DecisionNode(text=groups[0], depth=indent_level)
+    
+    def _h_menu(self, groups, line: str, indent_level: int) -> DecisionNode:
+        return DecisionNode(text="Choice", depth=indent_level)
+    
+    def _h_choice_bracket(self, groups, line: str, indent_level: int) -> ChoiceNode:
+        # Matches: + [Label] Description -> #Target
+        label = groups[0].strip()
+        text = groups[1].strip()
+        target = groups[2].strip()
+        return ChoiceNode(label=label, text=text, target=sys.intern(target), depth=indent_level)
+    
+    def _h_choice(self, groups, line: str, indent_level: int) -> ChoiceNode:
+        # Matches: + ->Label->#Target (simplified)
+        label = groups[0].strip()
+        target = groups[1].strip()
+        return ChoiceNode(label=label, text="", target=sys.intern(target), depth=indent_level)
+    
+    def _h_implicit_choice(self, groups, line: str, indent_level: int) -> ChoiceNode:
+        # Matches: ->Label->#Target
+        text = groups[0]
+        target = groups[1]
+        # Set text="" to match Twee behavior and consistency with other choices
+        return ChoiceNode(label=text, text="", target=sys.intern(target), depth=indent_level)
+    
+    def _h_inline_choice(self, groups, line: str, indent_level: int) -> ChoiceNode:
+        # Matches: [Label|#Target]
+        # Target group captures name AFTER #
+        label = groups[0]
+        target = groups[1]
+        return ChoiceNode(label=label, text="", target=sys.intern(target), depth=indent_level)
+    
+    def _h_link(self, groups, line: str, indent_level: int) -> ScriptNode:
+        # Twee [[Label|Target]] link
+        label = groups[0]
+        target = groups[1] if groups[1] is not None else label
+        # Check if this is a "Continue" link (jump) vs a choice
+        if label.strip().lower() == "continue":
+            # This is a jump converted to a link - convert back to JumpNode
+            return JumpNode(target=sys.intern(target), depth=indent_level)
+        # Regular choice link
+        return ChoiceNode(label=label, text="", target=sys.intern(target), depth=indent_level)
+    
+    def _h_jump(self, groups, line: str, indent_level: int) -> JumpNode:
+        return JumpNode(target=sys.intern(groups[0]), depth=indent_level)
+    
+    def _h_if(self, groups, line: str, indent_level: int) -> LogicNode:
+        cond = groups[0] if groups else None
+        # Normalize FFlow conditions to remove $ prefixes
+        if cond and hasattr(self.language, 'normalize_expression'):
+            cond = self.language.normalize_expression(cond)
+        return LogicNode(start_condition=cond, depth=indent_level)
+    
+    def _h_elif(self, groups, line: str, indent_level: int) -> LogicNode:
+        cond = groups[0]
+        # Normalize FFlow conditions to remove $ prefixes
+        if hasattr(self.language, 'normalize_expression'):
+            cond = self.language.normalize_expression(cond)
+        return LogicNode(start_condition=cond, is_elif=True, depth=indent_level)
+    
+    def _h_else(self, groups, line: str, indent_level: int) -> LogicNode:
+        return LogicNode(is_else=True, depth=indent_level)
+    
+    def _h_end(self, groups, line: str, indent_level: int) -> LogicNode:
+        return LogicNode(is_end=True, depth=indent_level)
+    
+    def _h_scene_heading(self, groups, line: str, indent_level: int) -> SceneHeadingNode:
+        return SceneHeadingNode(scene_id="SCENE", text=line, depth=indent_level)
+    
+    def _h_section_heading(self, groups, line: str, indent_level: int) -> SectionHeadingNode:
+        return SectionHeadingNode(text=line, anchor=groups[0], depth=indent_level)
+    
+    def _h_label(self, groups, line: str, indent_level: int) -> SectionHeadingNode:
+        # RenPy label / Twee passage: the name is both text and anchor
+        name = groups[0]
+        return SectionHeadingNode(text=name, anchor=name, depth=indent_level)
+    
+    def _h_dialogue(self, groups, line: str, indent_level: int) -> DialogueNode:
+        # Could be Twee format: **Character**: Text
+        # or RenPy format: character "text"
+        if self.language.name in ("twee", "renpy"):
+            return DialogueNode(character=groups[0], text=groups[1], depth=indent_level)
+        return self._h_dialogue_marker(groups, line, indent_level)
+    
+    def _h_dialogue_marker(self, groups, line: str, indent_level: int) -> DialogueNode:
+        # For FFlow character pattern, return a marker (will be handled separately)
+        return DialogueNode(character="", text="", depth=indent_level)
+    
+    # Names of the patterns that end a dialogue block
+    _DIALOGUE_BREAK_NAMES = frozenset({"section_heading", "asset", "state_change", "choice"})
+    
+    # Pattern name -> (node type the pattern must produce, handler method)
+    _PATTERN_HANDLERS: Dict[str, Tuple[type, str]] = {
+        "asset": (AssetNode, "_h_asset"),
+        "macro_bg": (AssetNode, "_h_bg"),
+        "macro_show": (AssetNode, "_h_show"),
+        "macro_audio": (AssetNode, "_h_music"),
+        "scene": (AssetNode, "_h_bg"),
+        "show": (AssetNode, "_h_show"),
+        "state_change": (StateChangeNode, "_h_state_change"),
+        "macro_set": (StateChangeNode, "_h_macro_set"),
+        "var_assign": (StateChangeNode, "_h_var_assign"),
+        "decision": (DecisionNode, "_h_decision"),
+        "menu": (DecisionNode, "_h_menu"),
+        "choice_bracket": (ChoiceNode, "_h_choice_bracket"),
+        "choice": (ChoiceNode, "_h_choice"),
+        "implicit_choice": (ChoiceNode, "_h_implicit_choice"),
+        "inline_choice": (ChoiceNode, "_h_inline_choice"),
+        "link": (ChoiceNode, "_h_link"),
+        "jump": (JumpNode, "_h_jump"),
+        "macro_goto": (JumpNode, "_h_jump"),
+        "conditional_if": (LogicNode, "_h_if"),
+        "macro_if": (LogicNode, "_h_if"),
+        "if": (LogicNode, "_h_if"),
+        "conditional_elif": (LogicNode, "_h_elif"),
+        "macro_elseif": (LogicNode, "_h_elif"),
+        "conditional_else": (LogicNode, "_h_else"),
+        "macro_else": (LogicNode, "_h_else"),
+        "else": (LogicNode, "_h_else"),
+        "conditional_end": (LogicNode, "_h_end"),
+        "macro_endif": (LogicNode, "_h_end"),
+        "scene_heading": (SceneHeadingNode, "_h_scene_heading"),
+        "section_heading": (SectionHeadingNode, "_h_section_heading"),
+        "label": (SectionHeadingNode, "_h_label"),
+        "passage": (SectionHeadingNode, "_h_label"),
+        "dialogue": (DialogueNode, "_h_dialogue"),
+    }
     
     def _parse_dialogue(self, lines: List[str], idx: int, character_line: str, 
-                       indent_level: int) -> tuple[Optional[DialogueNode], int]:
+                       indent_level: int, n: Optional[int] = None) -> tuple[Optional[DialogueNode], int]:
         """
         Parse dialogue block (FFlow format).
         
@@ -326,47 +406,49 @@ class GenericParser:
             idx: Current line index (character line)
             character_line: The character name line
             indent_level: Indentation level
+            n: Number of lines (computed from lines if not given)
             
         Returns:
             Tuple of (DialogueNode or None, new index)
         """
-        if idx + 1 >= len(lines) or not lines[idx + 1].strip():
+        if n is None:
+            n = len(lines)
+        if idx + 1 >= n:
+            return None, idx
+        # Each line is stripped once and reused by the checks below
+        next_line = lines[idx + 1].strip()
+        if not next_line:
             return None, idx
         
         character_name = character_line
         parenthetical = None
         dialogue_text = ""
         next_line_idx = idx + 1
-        next_line = lines[next_line_idx].strip()
         
         # Check for parenthetical
         p_match = re.match(r'^\s*(\(.*\))\s*$', next_line)
         if p_match:
             parenthetical = p_match.group(1)
             next_line_idx += 1
-            if next_line_idx < len(lines):
+            if next_line_idx < n:
                 next_line = lines[next_line_idx].strip()
         
         # Collect dialogue lines
+        break_re = self._dialogue_break_re
         dialogue_lines = []
-        while next_line_idx < len(lines):
-            d_line = lines[next_line_idx].strip()
+        d_line = next_line
+        while next_line_idx < n:
             if not d_line:
                 break
             
             # Check if we hit another structure element
-            should_break = False
-            for pattern in self.language.patterns:
-                if pattern.name in ["section_heading", "asset", "state_change", "choice"]:
-                    if pattern.match(d_line):
-                        should_break = True
-                        break
-            
-            if should_break:
+            if break_re is not None and break_re.match(d_line):
                 break
             
             dialogue_lines.append(d_line)
             next_line_idx += 1
+            if next_line_idx < n:
+                d_line = lines[next_line_idx].strip()
         
         dialogue_text = " ".join(dialogue_lines)
         
@@ -6,7 +6,7 @@ language-based parser architecture under the hood.
 """
 
 import re
-from typing import List, Optional, Dict, Any
+from typing import Iterable, List, Optional, Dict, Any
 from ..core.ast_nodes import (
     ScriptNode, ScriptAST, FrontmatterNode, SceneHeadingNode, SectionHeadingNode,
     ActionNode, DialogueNode, AssetNode, StateChangeNode, LogicNode,
@@ -60,6 +60,32 @@ class FFlowParser:
             Abstract Syntax Tree
         """
         return self._parser.parse(script_text)
+    
+    def parse_lines(self, lines: Iterable[str]) -> ScriptAST:
+        """
+        Parse pre-split FFlow lines into an AST.
+        
+        Args:
+            lines: The FFlow script lines
+            
+        Returns:
+            Abstract Syntax Tree
+        """
+        return self._parser.parse_lines(lines)
+
+
+# Language definition shared by the convenience functions, created on first
+# use. It is read-only once built, so concurrent callers can share it; each
+# call still gets its own GenericParser, which holds the per-parse state.
+_default_language: Optional[FFlowLanguage] = None
+
+
+def _new_default_parser() -> GenericParser:
+    """Create a parser for one convenience call, reusing the shared language."""
+    global _default_language
+    if _default_language is None:
+        _default_language = FFlowLanguage()
+    return GenericParser(_default_language)
 
 
 def parse(script_text: str) -> ScriptAST:
@@ -72,5 +98,17 @@ def parse(script_text: str) -> ScriptAST:
     Returns:
         Abstract Syntax Tree
     """
-    parser = FFlowParser()
-    return parser.parse(script_text)
+    return _new_default_parser().parse(script_text)
+
+
+def parse_lines(lines: Iterable[str]) -> ScriptAST:
+    """
+    Convenience function to parse pre-split FFlow lines.
+    
+    Args:
+        lines: The FFlow script lines
+        
+    Returns:
+        Abstract Syntax Tree
+    """
+    return _new_default_parser().parse_lines(lines)
@@ -6,7 +6,7 @@ language-based architecture for consistency and maintainability.
 """
 
 import re
-from typing import List, Optional
+from typing import Iterable, List, Optional
 from ..core.ast_nodes import (
     ScriptNode, ScriptAST, FrontmatterNode, SceneHeadingNode, SectionHeadingNode,
     ActionNode, DialogueNode, AssetNode, StateChangeNode, LogicNode,
@@ -15,6 +15,29 @@ from ..core.ast_nodes import (
 from .engine import GenericParser
 from ..languages.twee import TweeLanguage
 from ..languages.renpy import RenPyLanguage
+from ..languages.fflow import VAR_REF_RE
+
+
+# Quote characters stripped from object-literal values
+_QUOTES = ('"', "'")
+
+
+def _parse_object_literal(var_value: str) -> dict:
+    """
+    Parse a StoryInit object literal ``{key: val, ...}`` into a dict of strings.
+    
+    Simple parsing - pairs are split on commas and values have one level of
+    matching quotes removed.
+    """
+    obj_dict = {}
+    for pair in var_value[1:-1].split(','):
+        k, sep, v = pair.partition(':')
+        if sep:
+            v = v.strip()
+            if v[:1] in _QUOTES and v.endswith(v[0]):
+                v = v[1:-1]
+            obj_dict[k.strip()] = v
+    return obj_dict
 
 
 class TweeParser:
@@ -43,9 +66,10 @@ class TweeParser:
     
     def _strip_vars(self, expr: str) -> str:
         """Remove $ from all variables for FFlow format."""
+        if '$' not in expr:
+            return expr
         # Remove $ prefix from all variable references
-        # Matches $varname, $object.property, $_localvar
-        return re.sub(r'\$([a-zA-Z_][\w.]*)', r'\1', expr)
+        return VAR_REF_RE.sub(r'\1', expr)
     
     def parse(self, text: str) -> ScriptAST:
         """
@@ -57,28 +81,43 @@ class TweeParser:
         Args:
             text: Twee/SugarCube formatted text
             
+        Returns:
+            FFlow AST
+        """
+        return self.parse_lines(text.split('\n'))
+    
+    def parse_lines(self, lines: Iterable[str]) -> ScriptAST:
+        """
+        Parse pre-split Twee lines into FFlow AST.
+        
+        Args:
+            lines: Twee/SugarCube formatted lines
+            
         Returns:
             FFlow AST
         """
         # Parse with generic parser first
-        ast = self._parser.parse(text)
+        ast = self._parser.parse_lines(lines)
         
         # Post-process: Convert StoryInit passage into FrontmatterNode
         if len(ast) > 0:
             # Check if first node is StoryInit section
-            if (isinstance(ast[0], SectionHeadingNode) and 
+            if (type(ast[0]) is SectionHeadingNode and 
                 ast[0].text == "StoryInit"):
                 
-                # Collect all StateChangeNodes that follow until next section
+                # Collect all StateChangeNodes that follow until next section;
+                # any other nodes in the passage are kept, in order
                 frontmatter_vars = {}
-                nodes_to_remove = [0]  # Remove StoryInit heading
+                kept = []
                 
+                n = len(ast)
                 i = 1
-                while i < len(ast) and not isinstance(ast[i], SectionHeadingNode):
-                    if isinstance(ast[i], StateChangeNode):
+                while i < n and type(ast[i]) is not SectionHeadingNode:
+                    node = ast[i]
+                    if type(node) is StateChangeNode:
                         # Parse the set expression to extract variable assignment
                         # Format: "$varname = { ... }" or "varname = value"
-                        expr = ast[i].expression
+                        expr = node.expression
                         if '=' in expr:
                             parts = expr.split('=', 1)
                             var_name = parts[0].strip()
@@ -91,40 +130,20 @@ class TweeParser:
                             # Try to evaluate object literals
                             if var_value.startswith('{') and var_value.endswith('}'):
                                 # Parse object literal {key: val, ...}
-                                obj_dict = {}
-                                content = var_value[1:-1].strip()
-                                if content:
-                                    # Simple parsing - split by comma
-                                    pairs = content.split(',')
-                                    for pair in pairs:
-                                        if ':' in pair:
-                                            k, v = pair.split(':', 1)
-                                            k = k.strip()
-                                            # Strip quotes more thoroughly
-                                            v = v.strip()
-                                            # Remove both outer quotes and escaped quotes
-                                            if v.startswith('"') and v.endswith('"'):
-                                                v = v[1:-1]
-                                            elif v.startswith("'") and v.endswith("'"):
-                                                v = v[1:-1]
-                                            obj_dict[k] = v
-                                frontmatter_vars[var_name] = obj_dict
+                                frontmatter_vars[var_name] = _parse_object_literal(var_value)
                             else:
                                 # Simple value
                                 frontmatter_vars[var_name] = var_value.strip('\'"')
-                        
-                        
-                        nodes_to_remove.append(i)
+                    else:
+                        kept.append(node)
                     i += 1
                 
                 # Create FrontmatterNode and replace the StoryInit section
                 if frontmatter_vars:
                     fm_node = FrontmatterNode(variables=frontmatter_vars, depth=0)
-                    # Remove nodes in reverse order to preserve indices
-                    for idx in reversed(nodes_to_remove):
-                        del ast[idx]
-                    # Insert frontmatter at the beginning
-                    ast.insert(0, fm_node)
+                    # One slice assignment swaps the passage for the
+                    # frontmatter plus its kept nodes
+                    ast[:i] = [fm_node, *kept]
         
         # NOTE: We intentionally do NOT merge ActionNode + JumpNode here
         # because in Twee, "text\n<<goto>>" is the correct representation
@@ -167,3 +186,15 @@ class RenPyParser:
             FFlow AST
         """
         return self._parser.parse(text)
+    
+    def parse_lines(self, lines: Iterable[str]) -> ScriptAST:
+        """
+        Parse pre-split Ren'Py lines into FFlow AST.
+        
+        Args:
+            lines: Ren'Py script lines
+            
+        Returns:
+            FFlow AST
+        """
+        return self._parser.parse_lines(lines)
\ No newline at end of file
@@ -5,7 +5,7 @@ This module provides a language-agnostic transpiler that uses LanguageDefinition
 to convert AST nodes into any target format.
 """
 
-from typing import List, Optional
+from typing import Iterator, List, Optional, TextIO
 from ..core.ast_nodes import (
     ScriptNode, ScriptAST, FrontmatterNode, SceneHeadingNode, SectionHeadingNode,
     ActionNode, DialogueNode, AssetNode, StateChangeNode, LogicNode,
@@ -14,6 +14,14 @@ from ..core.ast_nodes import (
 from ..languages.base import LanguageDefinition
 
 
+# Node types with a visit_* method, pre-bound in GenericTranspiler.__init__
+_NODE_TYPES = (
+    FrontmatterNode, SceneHeadingNode, SectionHeadingNode, ActionNode,
+    DialogueNode, AssetNode, StateChangeNode, LogicNode, DecisionNode,
+    ChoiceNode, JumpNode,
+)
+
+
 class GenericTranspiler:
     """
     Language-agnostic transpiler.
@@ -31,11 +39,24 @@ class GenericTranspiler:
         self.language = target_language
         self.indent_level = 0
         self.last_was_section = False
+        # Ren'Py marks blocks by indentation rather than explicit end markers
+        self._is_renpy = target_language.name == "renpy"
+        # Indent prefixes by level, grown on demand by indent()
+        self._indent_cache = ['']
+        
+        # Node type -> bound visit_* method, resolved once per type
+        self._dispatch = {
+            node_type: getattr(self, f'visit_{node_type.__name__}', self.generic_visit)
+            for node_type in _NODE_TYPES
+        }
     
     def transpile(self, ast: ScriptAST) -> str:
         """
         Transpile an AST to text in the target language.
         
+        Node fragments are collected in a list and joined with newlines in
+        a single pass; the output is never built by repeated concatenation.
+        
         Args:
             ast: The Abstract Syntax Tree to transpile
             
@@ -43,14 +64,74 @@ class GenericTranspiler:
             Formatted text in the target language
         """
         output_lines = []
+        append = output_lines.append
+        visit = self.visit
         
         for node in ast:
-            result = self.visit(node)
+            result = visit(node)
             if result:
-                output_lines.append(result)
+                append(result)
         
         return "\n".join(output_lines)
     
+    def transpile_lines(self, ast: ScriptAST) -> Iterator[str]:
+        """
+        Lazily transpile an AST into lines of the target language.
+        
+        Yields the lines of ``transpile(ast)`` one at a time without
+        building the full output string, so the result can be fed straight
+        into a parser's ``parse_lines``.
+        
+        Args:
+            ast: The Abstract Syntax Tree to transpile
+            
+        Yields:
+            Output lines, without trailing newlines
+        """
+        for result in self.iter_transpile(ast):
+            yield from result.split("\n")
+    
+    def iter_transpile(self, ast: ScriptAST) -> Iterator[str]:
+        """
+        Lazily transpile an AST into per-node output fragments.
+        
+        Joining the fragments with newlines gives ``transpile(ast)``; a
+        fragment may itself span several lines. Nodes that produce no
+        output are skipped.
+        
+        Args:
+            ast: The Abstract Syntax Tree to transpile
+            
+        Yields:
+            Formatted text for each node that produces output
+        """
+        visit = self.visit
+        for node in ast:
+            result = visit(node)
+            if result:
+                yield result
+    
+    def transpile_to(self, ast: ScriptAST, out: TextIO) -> None:
+        """
+        Transpile an AST straight into a text stream.
+        
+        Writes the same text as ``transpile(ast)``, fragment by fragment,
+        so the full output is never held in memory as one string.
+        
+        Args:
+            ast: The Abstract Syntax Tree to transpile
+            out: Writable text stream, e.g. an open output file
+        """
+        fragments = self.iter_transpile(ast)
+        first = next(fragments, None)
+        if first is None:
+            return
+        write = out.write
+        write(first)
+        for result in fragments:
+            write("\n")
+            write(result)
+    
     def visit(self, node: ScriptNode) -> Optional[str]:
         """
         Visit a node and format it using the language definition.
@@ -61,8 +142,11 @@ class GenericTranspiler:
         Returns:
             Formatted text for this node
         """
-        method_name = f'visit_{type(node).__name__}'
-        visitor = getattr(self, method_name, self.generic_visit)
+        visitor = self._dispatch.get(type(node))
+        if visitor is None:
+            node_type = type(node)
+            visitor = getattr(self, f'visit_{node_type.__name__}', self.generic_visit)
+            self._dispatch[node_type] = visitor
         return visitor(node)
     
     def generic_visit(self, node: ScriptNode) -> str:
@@ -71,7 +155,10 @@ class GenericTranspiler:
     
     def indent(self, text: str) -> str:
         """Add indentation to text."""
-        return ("    " * self.indent_level) + text
+        cache = self._indent_cache
+        while len(cache) <= self.indent_level:
+            cache.append(cache[-1] + "    ")
+        return cache[self.indent_level] + text
     
     def visit_FrontmatterNode(self, node: FrontmatterNode) -> str:
         """Visit a frontmatter node."""
@@ -91,7 +178,7 @@ class GenericTranspiler:
     def visit_ActionNode(self, node: ActionNode) -> str:
         """Visit an action node."""
         result = self.language.format_action(node.text)
-        if self.indent_level > 0 and self.language.name == "renpy":
+        if self._is_renpy and self.indent_level > 0:
             result = self.indent(result)
         self.last_was_section = False
         return result
@@ -99,7 +186,7 @@ class GenericTranspiler:
     def visit_DialogueNode(self, node: DialogueNode) -> str:
         """Visit a dialogue node."""
         result = self.language.format_dialogue(node.character, node.text, node.parenthetical)
-        if self.indent_level > 0 and self.language.name == "renpy":
+        if self._is_renpy and self.indent_level > 0:
             result = self.indent(result)
         self.last_was_section = False
         return result
@@ -107,14 +194,14 @@ class GenericTranspiler:
     def visit_AssetNode(self, node: AssetNode) -> str:
         """Visit an asset node."""
         result = self.language.format_asset(node.asset_type, node.data)
-        if self.indent_level > 0 and self.language.name == "renpy":
+        if self._is_renpy and self.indent_level > 0:
             result = self.indent(result)
         return result
     
     def visit_StateChangeNode(self, node: StateChangeNode) -> str:
         """Visit a state change node."""
         result = self.language.format_state_change(node.expression)
-        if self.indent_level > 0 and self.language.name == "renpy":
+        if self._is_renpy and self.indent_level > 0:
             result = self.indent(result)
         return result
     
@@ -122,7 +209,7 @@ class GenericTranspiler:
         """Visit a logic node."""
         # Handle indentation for indentation-based languages
         if node.is_end:
-            if self.language.name == "renpy":
+            if self._is_renpy:
                 # RenPy uses indentation, so just decrease level
                 if self.indent_level > 0:
                     self.indent_level -= 1
@@ -133,23 +220,23 @@ class GenericTranspiler:
         
         result = ""
         if node.is_else:
-            if self.language.name == "renpy" and self.indent_level > 0:
+            if self._is_renpy and self.indent_level > 0:
                 self.indent_level -= 1
             result = self.language.format_logic_else()
-            if self.language.name == "renpy":
+            if self._is_renpy:
                 result = self.indent(result)
                 self.indent_level += 1
         elif node.is_elif:
-            if self.language.name == "renpy" and self.indent_level > 0:
+            if self._is_renpy and self.indent_level > 0:
                 self.indent_level -= 1
             result = self.language.format_logic_elif(node.start_condition)
-            if self.language.name == "renpy":
+            if self._is_renpy:
                 result = self.indent(result)
                 self.indent_level += 1
         else:
             # IF statement
             result = self.language.format_logic_start(node.start_condition)
-            if self.language.name == "renpy":
+            if self._is_renpy:
                 result = self.indent(result)
                 self.indent_level += 1
         
@@ -158,7 +245,7 @@ class GenericTranspiler:
     def visit_DecisionNode(self, node: DecisionNode) -> str:
         """Visit a decision node."""
         result = self.language.format_decision(node.text)
-        if self.language.name == "renpy":
+        if self._is_renpy:
             result = self.indent(result)
             self.indent_level += 1
         return result
@@ -166,13 +253,13 @@ class GenericTranspiler:
     def visit_ChoiceNode(self, node: ChoiceNode) -> str:
         """Visit a choice node."""
         result = self.language.format_choice(node.label, node.text, node.target)
-        if self.indent_level > 0 and self.language.name == "renpy":
+        if self._is_renpy and self.indent_level > 0:
             result = self.indent(result)
         return result
     
     def visit_JumpNode(self, node: JumpNode) -> str:
         """Visit a jump node."""
         result = self.language.format_jump(node.target)
-        if self.indent_level > 0 and self.language.name == "renpy":
+        if self._is_renpy and self.indent_level > 0:
             result = self.indent(result)
         return result
@@ -7,7 +7,7 @@ the new language-based architecture for consistency and maintainability.
 
 from abc import ABC, abstractmethod
 import re
-from typing import List, Dict, Any
+from typing import Iterator, List, Dict, Any, TextIO
 from ..core.ast_nodes import (
     ScriptNode, ScriptAST, FrontmatterNode, SceneHeadingNode, SectionHeadingNode,
     ActionNode, DialogueNode, AssetNode, StateChangeNode, LogicNode,
@@ -26,9 +26,26 @@ class BaseTranspiler(ABC):
     def transpile(self, ast: ScriptAST) -> str:
         pass
     
+    def transpile_lines(self, ast: ScriptAST) -> Iterator[str]:
+        """Transpile to an iterable of output lines (see GenericTranspiler.transpile_lines)."""
+        return iter(self.transpile(ast).split("\n"))
+    
+    def transpile_to(self, ast: ScriptAST, out: TextIO) -> None:
+        """Write the transpiled text to a stream (see GenericTranspiler.transpile_to)."""
+        out.write(self.transpile(ast))
+    
     def visit(self, node: ScriptNode) -> str:
-        method_name = f'visit_{type(node).__name__}'
-        visitor = getattr(self, method_name, self.generic_visit)
+        # Node type -> bound visit_* method, filled on first use per type
+        # (subclasses don't call a shared __init__, so it is created lazily)
+        try:
+            dispatch = self._dispatch
+        except AttributeError:
+            dispatch = self._dispatch = {}
+        visitor = dispatch.get(type(node))
+        if visitor is None:
+            node_type = type(node)
+            visitor = getattr(self, f'visit_{node_type.__name__}', self.generic_visit)
+            dispatch[node_type] = visitor
         return visitor(node)
     
     def generic_visit(self, node: ScriptNode) -> str:
@@ -58,6 +75,28 @@ class TweeTranspiler(BaseTranspiler):
         """
         return self._transpiler.transpile(ast)
     
+    def transpile_lines(self, ast: ScriptAST) -> Iterator[str]:
+        """
+        Lazily transpile AST to Twee/SugarCube lines.
+        
+        Args:
+            ast: The AST to transpile
+            
+        Yields:
+            Twee/SugarCube formatted lines
+        """
+        return self._transpiler.transpile_lines(ast)
+    
+    def transpile_to(self, ast: ScriptAST, out: TextIO) -> None:
+        """
+        Transpile AST straight into a text stream.
+        
+        Args:
+            ast: The AST to transpile
+            out: Writable text stream
+        """
+        self._transpiler.transpile_to(ast, out)
+    
     # Keep old methods for any direct usage (though they won't be called)
     def _convert_expression(self, expr: str) -> str:
         """Legacy method - kept for compatibility."""
@@ -91,6 +130,28 @@ class RenPyTranspiler(BaseTranspiler):
         """
         return self._transpiler.transpile(ast)
     
+    def transpile_lines(self, ast: ScriptAST) -> Iterator[str]:
+        """
+        Lazily transpile AST to Ren'Py lines.
+        
+        Args:
+            ast: The AST to transpile
+            
+        Yields:
+            Ren'Py formatted lines
+        """
+        return self._transpiler.transpile_lines(ast)
+    
+    def transpile_to(self, ast: ScriptAST, out: TextIO) -> None:
+        """
+        Transpile AST straight into a text stream.
+        
+        Args:
+            ast: The AST to transpile
+            out: Writable text stream
+        """
+        self._transpiler.transpile_to(ast, out)
+    
     def indent(self, s: str) -> str:
         """Legacy method - kept for compatibility."""
         return self._transpiler.indent(s)
@@ -117,3 +178,25 @@ class FFlowTranspiler(BaseTranspiler):
             FFlow formatted text
         """
         return self._transpiler.transpile(ast)
+    
+    def transpile_lines(self, ast: ScriptAST) -> Iterator[str]:
+        """
+        Lazily transpile AST to FFlow lines.
+        
+        Args:
+            ast: The AST to transpile
+            
+        Yields:
+            FFlow formatted lines
+        """
+        return self._transpiler.transpile_lines(ast)
+    
+    def transpile_to(self, ast: ScriptAST, out: TextIO) -> None:
+        """
+        Transpile AST straight into a text stream.
+        
+        Args:
+            ast: The AST to transpile
+            out: Writable text stream
+        """
+        self._transpiler.transpile_to(ast, out)
@@ -2,7 +2,6 @@ import sys
 sys.path.insert(0, 'src')
 
 from fountain_flow.languages.fflow import FFlowLanguage
-import re
 
 lang = FFlowLanguage()
 
@@ -17,14 +16,11 @@ print()
 
 for line in test_lines:
     print(f"Line: {line}")
-    matched = False
-    for p in sorted(lang.patterns, key=lambda x: -x.priority):
-        match = p.match(line)
-        if match:
-            print(f"  MATCH! Pattern: {p.name} (priority {p.priority})")
-            print(f"  Groups: {match.groups()}")
-            matched = True
-            break
-    if not matched:
+    result = lang.match_line(line)
+    if result:
+        p, match = result
+        print(f"  MATCH! Pattern: {p.name} (priority {p.priority})")
+        print(f"  Groups: {match.groups()}")
+    else:
         print("  NO MATCH")
     print()
@@ -13,5 +13,5 @@ for line in test_lines:
     print(f"Testing: {repr(line)}")
     ast = parse(line)
     for node in ast:
-        print(f"  -> {type(node).__name__}: {node.__dict__}")
+        print(f"  -> {type(node).__name__}: {node.to_dict()}")
     print()
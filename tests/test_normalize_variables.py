@@ -0,0 +1,34 @@
+import pytest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../scripts')))
+
+from normalize_variables import VariableNormalizer, normalize_file
+
+SCRIPT = """$ HP: 100
+===
+INT. ROOM
+~ HP += 5
+(IF: HP > 0 and not dead)
+    Still standing.
+(END)
+"""
+
+def test_normalize_file_in_place(tmp_path):
+    path = tmp_path / "story.fflow"
+    path.write_text(SCRIPT, encoding='utf-8')
+    
+    # Omitting the output path rewrites the input file
+    normalize_file(str(path))
+    
+    assert path.read_text(encoding='utf-8') == VariableNormalizer().normalize_fflow_file(SCRIPT)
+    assert "~ $HP += 5" in path.read_text(encoding='utf-8')
+    # No temporary file is left behind
+    assert os.listdir(tmp_path) == ["story.fflow"]
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+    with tempfile.TemporaryDirectory() as tmp:
+        test_normalize_file_in_place(pathlib.Path(tmp))
+    print("test_normalize_file_in_place PASSED")
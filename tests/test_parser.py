@@ -4,10 +4,12 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 
 from fountain_flow.parser.fflow import parse
+from fountain_flow.languages.fflow import FFlowLanguage
+from fountain_flow.parser.reverse import TweeParser, RenPyParser
 from fountain_flow.core.ast_nodes import (
     SceneHeadingNode, DialogueNode, ActionNode, AssetNode, 
     StateChangeNode, LogicNode, DecisionNode, ChoiceNode, 
-    JumpNode, FrontmatterNode
+    JumpNode, FrontmatterNode, SectionHeadingNode
 )
 
 def test_frontmatter():
@@ -97,6 +99,35 @@ def test_choice():
     assert isinstance(nodes[0], DecisionNode)
     assert nodes[0].text == "What do?"
     assert isinstance(nodes[1], ChoiceNode)
+
+def test_candidate_patterns():
+    lang = FFlowLanguage()
+    # The fused scan must yield the same matches as a full priority scan
+    for line in ["~ HP += 5", "(IF: HP > 0)", "INT. BAR", "EVE", "+ ->Go->#NEXT", "Plain text."]:
+        full = [(p.name, p.match(line).groups()) for p in lang.patterns if p.match(line)]
+        assert [(p.name, m.groups()) for p, m in lang.iter_matches(line)] == full
+        # Groups sliced from the fused match equal the pattern's own groups
+        assert [(p.name, g) for p, g in lang.iter_match_groups(line)] == full
+        fused = lang.match_line(line)
+        assert (fused[0].name if fused else None) == (full[0][0] if full else None)
+
+def test_non_ascii_names():
+    # Groups that capture user-written names must accept non-ASCII letters
+    nodes = parse("! MÚSICA: theme")
+    assert isinstance(nodes[0], AssetNode)
+    assert nodes[0].asset_type == "MÚSICA"
+    
+    nodes = RenPyParser().parse("label café:\njump café")
+    assert isinstance(nodes[0], SectionHeadingNode)
+    assert isinstance(nodes[1], JumpNode)
+    assert nodes[1].target == "café"
+    
+    nodes = TweeParser().parse(":: Start\n<<set $santé to 5>>\n<<set $a.é = 1>>")
+    assert isinstance(nodes[1], StateChangeNode)
+    assert "santé" in nodes[1].expression
+    assert isinstance(nodes[2], StateChangeNode)
+    assert "a.é" in nodes[2].expression
+
 if __name__ == "__main__":
     try:
         test_frontmatter()
@@ -111,6 +142,10 @@ if __name__ == "__main__":
         print("test_logic_flow PASSED")
         test_choice()
         print("test_choice PASSED")
+        test_candidate_patterns()
+        print("test_candidate_patterns PASSED")
+        test_non_ascii_names()
+        print("test_non_ascii_names PASSED")
         print("ALL TESTS PASSED")
     except AssertionError as e:
         print(f"TEST FAILED: {e}")
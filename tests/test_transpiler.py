@@ -1,10 +1,12 @@
 import pytest
 import sys
 import os
+import io
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 
 from fountain_flow.parser.fflow import parse
 from fountain_flow.transpiler.formats import TweeTranspiler, RenPyTranspiler
+from fountain_flow.languages.registry import LanguageRegistry, _identity
 
 def test_twee_transpiler():
     script = """
@@ -107,6 +109,38 @@ Action2.
     assert "(IF: x > 1)" in output
     assert "Action." in output
 
+def test_transpile_lines():
+    script = """
+$ HP: 100
+===
+INT. ROOM
+EVE
+Hello.
++ [Move] Go. -> #NEXT
+"""
+    ast = parse(script.strip())
+    # Fresh transpilers: indentation state carries across calls
+    output = TweeTranspiler().transpile(ast)
+    assert list(TweeTranspiler().transpile_lines(ast)) == output.split('\n')
+    
+    # Streaming writes the same text, including Ren'Py's skipped (END) output
+    ast = parse("INT. START\n(IF: x > 1)\n    Yes.\n(END)\nDone.")
+    out = io.StringIO()
+    RenPyTranspiler().transpile_to(ast, out)
+    assert out.getvalue() == RenPyTranspiler().transpile(ast)
+
+def test_identity_transforms():
+    registry = LanguageRegistry()
+    methods = ('transform_variable_reference', 'transform_expression', 'transform_condition')
+    # FFlow and Ren'Py pass expressions through unchanged
+    for name in ('fflow', 'renpy'):
+        language = registry.get_language(name)
+        assert all(getattr(language, m) is _identity for m in methods)
+    # Twee rewrites them, so its methods stay as defined
+    twee = registry.get_language('twee')
+    assert not any(getattr(twee, m) is _identity for m in methods)
+    assert twee.transform_expression("HP > 0") != "HP > 0"
+
 if __name__ == "__main__":
     try:
         test_twee_transpiler()
@@ -115,6 +149,10 @@ if __name__ == "__main__":
         print("test_renpy_transpiler_indentation PASSED")
         test_fflow_transpiler()
         print("test_fflow_transpiler PASSED")
+        test_transpile_lines()
+        print("test_transpile_lines PASSED")
+        test_identity_transforms()
+        print("test_identity_transforms PASSED")
         print("ALL TESTS PASSED")
     except AssertionError as e:
         print(f"TEST FAILED: {e}")